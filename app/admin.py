@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
+from app.models.link import Link
 from app.models.user import User
 
 class Admin(UserAdmin):
@@ -24,3 +25,11 @@ class Admin(UserAdmin):
 admin.site.register(User, Admin)
 
 
+class LinkAdmin(admin.ModelAdmin):
+    list_display = ('url', 'source', 'status', 'scrape_attempts', 'scraped_at', 'created_at')
+    list_filter = ('source', 'status',)
+    search_fields = ('url',)
+    ordering = ('-created_at',)
+
+
+admin.site.register(Link, LinkAdmin)
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+from app.utils import metrics
+
+
+class MetricsAllowed(permissions.BasePermission):
+    """Superusers, and the prometheus servers listed in METRICS_ALLOWED_IPS."""
+
+    def has_permission(self, request, view):
+        if request.user and request.user.is_superuser:
+            return True
+        return request.META.get("REMOTE_ADDR") in settings.METRICS_ALLOWED_IPS
+
+
+class MetricsView(APIView):
+    """
+    Crawl, scrape and celery metrics of all processes
+
+    get: Returns the metrics in the Prometheus text format, for a prometheus scrape job
+    """
+
+    permission_classes = [
+        MetricsAllowed,
+    ]
+
+    def get(self, request):
+        return HttpResponse(metrics.render(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,181 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import permissions, serializers, status
+from rest_framework.response import Response
+
+from app.api.base import AsyncAPIView
+from app.selectors.news_selector import aexport_news, cached_news_detail, cached_news_list, export_news, search_news
+from app.utils.ndjson import aiter_ndjson, iter_ndjson
+
+
+class NewsListView(AsyncAPIView):
+    """
+    Lists scraped news published between two dates
+
+    get: Returns news of the date range newest first, pass `next_cursor` of the response as `cursor` for the next page
+    """
+
+    class InputSerializer(serializers.Serializer):
+        date_from = serializers.DateField(required=True, help_text="First published date, inclusive")
+        date_to = serializers.DateField(required=True, help_text="Last published date, inclusive")
+        source = serializers.CharField(required=False, help_text="Domain of the news portal e.g. onlinekhabar.com")
+        cursor = serializers.CharField(required=False, help_text="Cursor of the next page")
+        limit = serializers.IntegerField(required=False, default=50, min_value=1, max_value=200)
+        include_body = serializers.BooleanField(required=False, default=False, help_text="Include the article text")
+        canonical_only = serializers.BooleanField(
+            required=False, default=False, help_text="Leave out copies of a story republished by other portals"
+        )
+
+        def validate(self, attrs):
+            if attrs["date_from"] > attrs["date_to"]:
+                raise serializers.ValidationError(
+                    {"date_from": "date_from must not be after date_to."}
+                )
+            return attrs
+
+    permission_classes = [
+        permissions.AllowAny,
+    ]
+
+    async def get(self, request):
+        serializer = self.InputSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        result = await cached_news_list(**serializer.validated_data)
+
+        return Response(
+            {
+                "message": "News retrieved successfully.",
+                "success": True,
+                "code": status.HTTP_200_OK,
+                "data": result["data"],
+                "next_cursor": result["next_cursor"],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class NewsSearchView(AsyncAPIView):
+    """
+    Full text search over the title and body of scraped news
+
+    get: Returns the news best matching all the keywords of `q`
+    """
+
+    class InputSerializer(serializers.Serializer):
+        q = serializers.CharField(required=True, max_length=200, help_text="Keywords, Nepali or English")
+        date_from = serializers.DateField(required=False, help_text="First published date, inclusive")
+        date_to = serializers.DateField(required=False, help_text="Last published date, inclusive")
+        source = serializers.CharField(required=False, help_text="Domain of the news portal e.g. onlinekhabar.com")
+        limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100)
+
+        def validate(self, attrs):
+            if ("date_from" in attrs) != ("date_to" in attrs):
+                raise serializers.ValidationError(
+                    {"date_from": "date_from and date_to must be given together."}
+                )
+            if "date_from" in attrs and attrs["date_from"] > attrs["date_to"]:
+                raise serializers.ValidationError(
+                    {"date_from": "date_from must not be after date_to."}
+                )
+            return attrs
+
+    permission_classes = [
+        permissions.AllowAny,
+    ]
+
+    async def get(self, request):
+        serializer = self.InputSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        results = await search_news(serializer.validated_data.pop("q"), **serializer.validated_data)
+
+        return Response(
+            {
+                "message": "News retrieved successfully.",
+                "success": True,
+                "code": status.HTTP_200_OK,
+                "data": results,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class NewsDetailView(AsyncAPIView):
+    """
+    Gets a single scraped news
+
+    get: Returns the title, date and body of the news with the copies of the same story on other portals
+    """
+
+    permission_classes = [
+        permissions.AllowAny,
+    ]
+
+    async def get(self, request, news_id):
+        news = await cached_news_detail(news_id)
+        if news is None:
+            raise Http404
+
+        return Response(
+            {
+                "message": "News retrieved successfully.",
+                "success": True,
+                "code": status.HTTP_200_OK,
+                "data": news,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class NewsExportView(AsyncAPIView):
+    """
+    Bulk export of scraped news for downstream jobs
+
+    get: Streams every news of the date range with its body as newline delimited json, oldest first
+
+    Under daphne the body is an async generator over the database cursor, sent
+    from the event loop while each chunk of rows is fetched in a thread. Under
+    runserver or another WSGI server it is a plain generator instead, which
+    Django would otherwise collect into memory before sending.
+    """
+
+    class InputSerializer(serializers.Serializer):
+        date_from = serializers.DateField(required=True, help_text="First published date, inclusive")
+        date_to = serializers.DateField(required=True, help_text="Last published date, inclusive")
+        source = serializers.CharField(required=False, help_text="Domain of the news portal e.g. onlinekhabar.com")
+        canonical_only = serializers.BooleanField(
+            required=False, default=False, help_text="Leave out copies of a story republished by other portals"
+        )
+        compress = serializers.BooleanField(required=False, default=False, help_text="Gzip the export")
+
+        def validate(self, attrs):
+            if attrs["date_from"] > attrs["date_to"]:
+                raise serializers.ValidationError(
+                    {"date_from": "date_from must not be after date_to."}
+                )
+            return attrs
+
+    permission_classes = [
+        permissions.IsAuthenticated,
+    ]
+
+    async def get(self, request):
+        serializer = self.InputSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        params = serializer.validated_data
+        compress = params.pop("compress")
+        filename = f"news_{params['date_from']}_{params['date_to']}.ndjson"
+
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_ndjson(aexport_news(**params), compress=compress)
+        else:
+            content = iter_ndjson(export_news(**params), compress=compress)
+
+        response = StreamingHttpResponse(
+            content,
+            content_type="application/gzip" if compress else "application/x-ndjson",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}{".gz" if compress else ""}"'
+        return response
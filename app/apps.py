@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app'
+
+    def ready(self):
+        # Timing and queue lag of the tasks are recorded by signal handlers. prometheus_client is
+        # only imported once the settings pointed PROMETHEUS_MULTIPROC_DIR to METRICS_DIR
+        from app.utils import metrics  # noqa: F401
@@ -0,0 +1,115 @@
+import statistics
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from app.utils.driver_pool import DriverPool
+
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+
+# Recorded pages of the portals, by the domain of their extractor
+FRONT_PAGES = {
+    "onlinekhabar.com": "onlinekhabar_front.html",
+    "ekantipur.com": "ekantipur_front.html",
+}
+ARTICLES = {
+    "onlinekhabar.com": ["onlinekhabar_article_rain.html", "onlinekhabar_article_budget.html"],
+    "ekantipur.com": ["ekantipur_article_rain.html", "ekantipur_article_budget.html"],
+}
+
+
+def read_page(name):
+    return (CORPUS_DIR / name).read_text(encoding="utf-8")
+
+
+class _CorpusHandler(SimpleHTTPRequestHandler):
+    extensions_map = {".html": "text/html; charset=utf-8"}
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CorpusServer:
+    """Serves the corpus over keep-alive HTTP on a free local port, in a background thread."""
+
+    def __init__(self):
+        _CorpusHandler.protocol_version = "HTTP/1.1"
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(_CorpusHandler, directory=str(CORPUS_DIR)))
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, name):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/{name}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class FakeDriver:
+    """In-process stand-in of a selenium session, rendering pages straight from the corpus."""
+
+    def __init__(self):
+        self.page_source = ""
+
+    def get(self, url):
+        self.page_source = read_page(Path(urlsplit(url).path).name)
+
+    def execute_script(self, script):
+        return self.page_source if "innerHTML" in script else 1
+
+    def quit(self):
+        pass
+
+
+def corpus_driver_pool():
+    """Driver pool of FakeDriver sessions, for fetch_selenium."""
+    return DriverPool(size=1, max_pages=settings.SELENIUM_MAX_PAGES_PER_SESSION, factory=FakeDriver)
+
+
+class StageResult:
+    def __init__(self, name, timings, items_per_run=1):
+        self.name = name
+        self.runs = len(timings)
+        self.items = self.runs * items_per_run
+        self.total = sum(timings)
+        # p50 and p99 of one run, per item when a run handles a batch
+        per_item = [timing / items_per_run for timing in timings]
+        if len(per_item) > 1:
+            quantiles = statistics.quantiles(per_item, n=100, method="inclusive")
+            self.p50, self.p99 = quantiles[49], quantiles[98]
+        else:
+            self.p50 = self.p99 = per_item[0] if per_item else 0.0
+
+    @property
+    def per_second(self):
+        return self.items / self.total if self.total else 0.0
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "per_second": round(self.per_second, 2),
+            "p50_ms": round(self.p50 * 1000, 3),
+            "p99_ms": round(self.p99 * 1000, 3),
+        }
+
+
+def measure(name, func, inputs, iterations, items_per_run=1):
+    """Call `func` with every input `iterations` times and time each call."""
+    timings = []
+    for _ in range(iterations):
+        for value in inputs:
+            started = time.perf_counter()
+            func(value)
+            timings.append(time.perf_counter() - started)
+    return StageResult(name, timings, items_per_run)
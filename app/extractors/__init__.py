@@ -0,0 +1,31 @@
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+_extractors = {}
+_lock = threading.Lock()
+
+
+def registered_domains():
+    return list(settings.NEWS_EXTRACTORS)
+
+
+def get_extractor(domain):
+    """
+    Return the extractor class registered for `domain` in NEWS_EXTRACTORS, or None.
+
+    Extractor modules are imported on first use, so a worker only loads the
+    sites it actually scrapes.
+    """
+    path = settings.NEWS_EXTRACTORS.get(domain)
+    if path is None:
+        return None
+
+    extractor = _extractors.get(path)
+    if extractor is None:
+        with _lock:
+            extractor = _extractors.get(path)
+            if extractor is None:
+                extractor = _extractors[path] = import_string(path)
+    return extractor
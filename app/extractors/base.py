@@ -0,0 +1,160 @@
+import datetime as dt
+import re
+import threading
+
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from app.extractors.selectors import Selector
+from app.utils.devanagari import to_ascii_digits
+from app.utils.extraction import parse_published_at
+
+
+def gregorian_date(fields):
+    """Aware datetime of the numeric year, month, day, hour and minute matched by a date pattern."""
+    try:
+        published_at = dt.datetime(
+            int(fields["year"]), int(fields["month"]), int(fields["day"]),
+            int(fields.get("hour") or 0), int(fields.get("minute") or 0),
+        )
+    except (KeyError, ValueError):
+        return None
+    return timezone.make_aware(published_at)
+
+
+def gregorian_dates(rows):
+    return [gregorian_date(fields) for fields in rows]
+
+
+# Calendars a site can publish its dates in, the value of `date_converter`, with the
+# converters of one date and of a batch of dates
+DATE_CONVERTERS = {
+    "gregorian": ("app.extractors.base.gregorian_date", "app.extractors.base.gregorian_dates"),
+    "bikram_sambat": ("app.utils.nepali_date.bikram_sambat_date", "app.utils.nepali_date.bikram_sambat_dates"),
+}
+
+
+class CompiledRules:
+    """Selectors, patterns and date converter of an extractor, compiled once per process."""
+
+    def __init__(
+        self, title, published, body, article_urls,
+        date_patterns=(), date_converter=gregorian_date, date_batch_converter=gregorian_dates,
+    ):
+        self.title = title
+        self.published = published
+        self.body = body
+        self.article_urls = article_urls
+        self.date_patterns = date_patterns
+        self.date_converter = date_converter
+        self.date_batch_converter = date_batch_converter
+
+    def match_published(self, published_raw):
+        """Groups of the first date pattern matching the raw date text, or None."""
+        text = to_ascii_digits(published_raw)
+        for pattern in self.date_patterns:
+            match = pattern.search(text)
+            if match:
+                return {key: value for key, value in match.groupdict().items() if value}
+        return None
+
+    def parse_published(self, published_raw):
+        """Published datetime of the raw date text of the page, ISO 8601 when no date pattern matches."""
+        if not published_raw:
+            return None
+
+        fields = self.match_published(published_raw)
+        if fields is None:
+            return parse_published_at(published_raw)
+        return self.date_converter(fields)
+
+    def parse_published_many(self, published_raws):
+        """`parse_published` of every raw date text, the matched dates are converted as one batch."""
+        matches = [self.match_published(raw) if raw else None for raw in published_raws]
+        converted = iter(self.date_batch_converter([fields for fields in matches if fields is not None]))
+        return [
+            parse_published_at(raw) if fields is None else next(converted)
+            for raw, fields in zip(published_raws, matches)
+        ]
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+class SiteExtractor:
+    """
+    Extraction rules of one news portal.
+
+    Subclasses only declare the css selectors of the article parts and the url
+    patterns of article pages, the generic parser does the rest. Fields left as
+    None fall back to the generic og:title / article:published_time / <article>
+    heuristics.
+    """
+
+    domain = None
+    front_page = None
+    # Pages of the site are rendered client side and always need selenium
+    js_required = False
+
+    # Bump when the rules change in a way the cached compiled rules must not survive
+    version = 1
+
+    title_selector = None
+    published_selector = None
+    body_selector = None
+    # Regexes of the urls that are articles, other links found on the front page are ignored
+    article_url_patterns = ()
+    # Regexes of the published date text, matched with ascii digits, with year, month (or
+    # month_name) and day groups, hour and minute are optional
+    date_patterns = ()
+    # Key of DATE_CONVERTERS turning the matched groups into a datetime
+    date_converter = "gregorian"
+
+    @classmethod
+    def rule_source(cls):
+        """Everything the compiled rules are built from."""
+        return (
+            cls.title_selector,
+            cls.published_selector,
+            cls.body_selector,
+            tuple(cls.article_url_patterns),
+            tuple(cls.date_patterns),
+            cls.date_converter,
+        )
+
+    @classmethod
+    def compile(cls):
+        converter, batch_converter = DATE_CONVERTERS[cls.date_converter]
+        return CompiledRules(
+            title=Selector(cls.title_selector) if cls.title_selector else None,
+            published=Selector(cls.published_selector) if cls.published_selector else None,
+            body=Selector(cls.body_selector) if cls.body_selector else None,
+            article_urls=[re.compile(pattern) for pattern in cls.article_url_patterns],
+            date_patterns=[re.compile(pattern) for pattern in cls.date_patterns],
+            date_converter=import_string(converter),
+            date_batch_converter=import_string(batch_converter),
+        )
+
+    @classmethod
+    def rules(cls):
+        """
+        The compiled rules of the extractor, cached per process.
+
+        The cache is keyed by the extractor, its version and its rule source, so
+        rules changed at runtime or a new version are compiled again and the hot
+        scraping loop only ever does a dict lookup.
+        """
+        key = (cls.version, cls.rule_source())
+        entry = _compiled.get(cls)
+        if entry is None or entry[0] != key:
+            with _compiled_lock:
+                entry = _compiled.get(cls)
+                if entry is None or entry[0] != key:
+                    entry = _compiled[cls] = (key, cls.compile())
+        return entry[1]
+
+    @classmethod
+    def is_article_url(cls, url):
+        patterns = cls.rules().article_urls
+        return not patterns or any(pattern.search(url) for pattern in patterns)
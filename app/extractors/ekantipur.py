@@ -0,0 +1,11 @@
+from app.extractors.base import SiteExtractor
+
+
+class EkantipurExtractor(SiteExtractor):
+    domain = "ekantipur.com"
+    front_page = "https://ekantipur.com"
+
+    title_selector = "div.article-header h1"
+    published_selector = "time"
+    body_selector = "div.description"
+    article_url_patterns = (r"ekantipur\.com/[\w-]+/\d{4}/\d{2}/\d{2}/[\w-]+",)
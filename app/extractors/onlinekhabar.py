@@ -0,0 +1,16 @@
+from app.extractors.base import SiteExtractor
+
+
+class OnlinekhabarExtractor(SiteExtractor):
+    domain = "onlinekhabar.com"
+    front_page = "https://www.onlinekhabar.com"
+
+    title_selector = "div.ok-post-header h1"
+    published_selector = "div.ok-news-post-hour span"
+    body_selector = "div.ok18-single-post-content-wrap"
+    article_url_patterns = (r"onlinekhabar\.com/\d{4}/\d{2}/\d+",)
+    # e.g. "जेठ १५, २०८०" or "जेठ १५, २०८० १०:३०"
+    date_patterns = (
+        r"(?P<month_name>[\u0900-\u097F]+)\s+(?P<day>\d{1,2}),?\s+(?P<year>\d{4})(?:\s+(?P<hour>\d{1,2}):(?P<minute>\d{2}))?",
+    )
+    date_converter = "bikram_sambat"
@@ -0,0 +1,76 @@
+import re
+
+# Supports the subset of css used by the site rules: tag, #id, .class, [attr] and [attr=value]
+# compounds joined by the descendant combinator, e.g. "div.ok-single-content p"
+COMPOUND = re.compile(r"""
+    (?P<tag>[a-zA-Z][a-zA-Z0-9-]*|\*)?
+    (?P<rest>(?:\#[\w-]+|\.[\w-]+|\[[\w-]+(?:=["']?[^\]"']*["']?)?\])*)
+    """, re.VERBOSE)
+PART = re.compile(r"""\#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+)|\[(?P<attr>[\w-]+)(?:=["']?(?P<value>[^\]"']*)["']?)?\]""")
+
+
+class Compound:
+    __slots__ = ("tag", "id", "classes", "attrs")
+
+    def __init__(self, tag, id, classes, attrs):
+        self.tag = tag
+        self.id = id
+        self.classes = classes
+        self.attrs = attrs
+
+    def matches(self, element):
+        tag, attrs, classes = element
+        if self.tag is not None and self.tag != tag:
+            return False
+        if self.id is not None and attrs.get("id") != self.id:
+            return False
+        if not self.classes <= classes:
+            return False
+        for name, value in self.attrs:
+            if name not in attrs or (value is not None and attrs[name] != value):
+                return False
+        return True
+
+
+def _compile_compound(text):
+    match = COMPOUND.fullmatch(text)
+    if match is None or not text:
+        raise ValueError(f"Unsupported selector: {text!r}")
+
+    tag = match.group("tag")
+    id_, classes, attrs = None, set(), []
+    for part in PART.finditer(match.group("rest")):
+        if part.group("id"):
+            id_ = part.group("id")
+        elif part.group("cls"):
+            classes.add(part.group("cls"))
+        else:
+            attrs.append((part.group("attr"), part.group("value")))
+
+    return Compound(None if tag in (None, "*") else tag.lower(), id_, frozenset(classes), tuple(attrs))
+
+
+class Selector:
+    """A compiled descendant selector matched against the stack of open elements."""
+
+    def __init__(self, text):
+        self.text = text
+        self.compounds = tuple(_compile_compound(part) for part in text.split())
+        if not self.compounds:
+            raise ValueError("Empty selector")
+
+    def matches(self, stack):
+        """True when the innermost element of `stack` is selected."""
+        if not stack or not self.compounds[-1].matches(stack[-1]):
+            return False
+
+        remaining = len(self.compounds) - 2
+        for element in reversed(stack[:-1]):
+            if remaining < 0:
+                break
+            if self.compounds[remaining].matches(element):
+                remaining -= 1
+        return remaining < 0
+
+    def __repr__(self):
+        return f"Selector({self.text!r})"
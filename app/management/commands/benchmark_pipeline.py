@@ -0,0 +1,146 @@
+import json
+import random
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from app.benchmarks.harness import ARTICLES, FRONT_PAGES, CorpusServer, corpus_driver_pool, measure, read_page
+from app.extractors import get_extractor
+from app.models.link import Link
+from app.services.article_service import SCRAPED_FIELDS, search_vector
+from app.services.dedup_service import BAND_FIELDS, assign_cluster
+from app.utils import scrapers
+from app.utils.devanagari import tokenize
+from app.utils.extraction import extract_links, parse_article
+from app.utils.simhash import bands, simhash, to_signed
+
+STAGES = ("fetch_http", "fetch_selenium", "links", "article", "dedup", "persist")
+
+
+def chunks(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the scraping pipeline offline against the recorded pages of app/benchmarks/corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=100, help="Runs over the corpus per stage")
+        parser.add_argument("--stage", action="append", choices=STAGES, help="Only run these stages")
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows per bulk write of the persist stage")
+        parser.add_argument(
+            "--seed-rows", type=int, default=10000, help="Scraped news in the table the dedup stage queries"
+        )
+        parser.add_argument("--json", action="store_true", help="Print the results as json, e.g. to diff in CI")
+
+    def handle(self, *args, **options):
+        stages = options["stage"] or STAGES
+        iterations = options["iterations"]
+
+        fronts = [(domain, name, read_page(name)) for domain, name in FRONT_PAGES.items()]
+        articles = [(domain, name, read_page(name)) for domain, pages in ARTICLES.items() for name in pages]
+
+        results = []
+        # The local server serves no robots.txt and must not be rate limited, the fetches skip the throttle
+        with CorpusServer() as server:
+            urls = [server.url(name) for _, name, _ in fronts + articles]
+
+            if "fetch_http" in stages:
+                results.append(
+                    measure("fetch_http", lambda url: scrapers.fetch_http(url, throttled=True), urls, iterations)
+                )
+
+            if "fetch_selenium" in stages:
+                pool = corpus_driver_pool()
+                results.append(measure(
+                    "fetch_selenium", lambda url: scrapers.fetch_selenium(url, throttled=True, pool=pool),
+                    urls, iterations,
+                ))
+                pool.close()
+
+        if "links" in stages:
+            inputs = [(page, f"https://{domain}", get_extractor(domain)) for domain, _, page in fronts]
+            results.append(measure("links", lambda args: extract_links(*args), inputs, iterations))
+
+        size = settings.SCRAPER_STREAM_CHUNK_SIZE
+        inputs = [
+            (chunks(page, size), f"https://{domain}/{name}", None, get_extractor(domain).rules())
+            for domain, name, page in articles
+        ]
+        parsed = [parse_article(*args) for args in inputs]
+        if "article" in stages:
+            results.append(measure("article", lambda args: parse_article(*args), inputs, iterations))
+
+        # Database stages run in a transaction which is rolled back, nothing is left behind
+        if "dedup" in stages or "persist" in stages:
+            with transaction.atomic():
+                if "dedup" in stages:
+                    self._seed(parsed, options["seed_rows"], options["batch_size"])
+                    inputs = [
+                        (Link(url=f"https://bench/{i}", published_at=article.published_at), article.body)
+                        for i, article in enumerate(parsed)
+                    ]
+                    results.append(measure("dedup", lambda args: assign_cluster(*args), inputs, iterations))
+
+                if "persist" in stages:
+                    results.append(self._persist(parsed, options["batch_size"], iterations))
+                transaction.set_rollback(True)
+
+        self._report(results, options["json"])
+
+    def _seed(self, parsed, rows, batch_size):
+        """Scraped news with the simhash of every corpus article and random ones, for the band lookups to sift."""
+        signatures = [simhash(tokenize(article.body)) for article in parsed]
+        rng = random.Random(0)
+        signatures += [rng.getrandbits(64) for _ in range(max(0, rows - len(signatures)))]
+
+        links = []
+        for n, signature in enumerate(signatures):
+            link = Link(
+                url=f"https://bench/seed/{n}",
+                url_hash=f"seed{n:060d}",
+                source="bench",
+                status=Link.Status.SCRAPED,
+                published_at=parsed[n % len(parsed)].published_at,
+                simhash=to_signed(signature),
+            )
+            for field, value in zip(BAND_FIELDS, bands(signature)):
+                setattr(link, field, value)
+            links.append(link)
+        Link.objects.bulk_create(links, batch_size=batch_size)
+
+    def _persist(self, parsed, batch_size, iterations):
+        counter = iter(range(10 ** 9))
+
+        def write(batch_size):
+            now = timezone.now()
+            numbers = [next(counter) for _ in range(batch_size)]
+            links = Link.objects.bulk_create(
+                [Link(url=f"https://bench/{n}", url_hash=f"{n:064d}", source="bench") for n in numbers]
+            )
+            for n, link in enumerate(links):
+                article = parsed[n % len(parsed)]
+                link.title = article.title
+                link.published_raw = article.published_raw
+                link.published_at = article.published_at
+                link.body = article.body
+                link.search_vector = search_vector(article.title, article.body)
+                link.status = Link.Status.SCRAPED
+                link.scraped_at = link.updated_at = now
+            Link.objects.bulk_update(links, SCRAPED_FIELDS)
+
+        return measure("persist", write, [batch_size], max(1, iterations // 10), items_per_run=batch_size)
+
+    def _report(self, results, as_json):
+        rows = [result.as_dict() for result in results]
+        if as_json:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        self.stdout.write(f"{'stage':<16}{'items':>8}{'items/s':>12}{'p50 ms':>10}{'p99 ms':>10}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['stage']:<16}{row['items']:>8}{row['per_second']:>12.1f}{row['p50_ms']:>10.3f}{row['p99_ms']:>10.3f}"
+            )
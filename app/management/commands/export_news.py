@@ -0,0 +1,49 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from app.selectors.news_selector import export_news
+from app.utils.ndjson import iter_ndjson
+
+
+def date(value):
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = "Export scraped news of a date range as newline delimited json"
+
+    def add_arguments(self, parser):
+        parser.add_argument("date_from", type=date, help="First published date, YYYY-MM-DD")
+        parser.add_argument("date_to", type=date, help="Last published date, YYYY-MM-DD")
+        parser.add_argument("--source", help="Domain of the news portal e.g. onlinekhabar.com")
+        parser.add_argument("--canonical-only", action="store_true", help="Leave out republished copies")
+        parser.add_argument("--gzip", action="store_true", help="Gzip the output")
+        parser.add_argument("--output", "-o", help="File to write, stdout when omitted")
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Rows fetched from the cursor at a time")
+
+    def handle(self, *args, **options):
+        if options["date_from"] > options["date_to"]:
+            raise CommandError("date_from must not be after date_to.")
+
+        rows = export_news(
+            options["date_from"],
+            options["date_to"],
+            source=options["source"],
+            canonical_only=options["canonical_only"],
+            chunk_size=options["chunk_size"],
+        )
+
+        output = open(options["output"], "wb") if options["output"] else sys.stdout.buffer
+        try:
+            for block in iter_ndjson(rows, compress=options["gzip"]):
+                output.write(block)
+        finally:
+            if options["output"]:
+                output.close()
+            else:
+                output.flush()
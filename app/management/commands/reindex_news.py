@@ -0,0 +1,85 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.extractors import get_extractor
+from app.extractors.base import SiteExtractor
+from app.models.link import Link
+from app.services.article_service import search_vector
+from app.utils.news_cache import invalidate_news
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full text search vectors, or the published dates, of scraped news"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild every vector, not only the missing ones")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dates", action="store_true",
+            help="Normalise the published dates from their raw text with the date rules of each site instead",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Link.objects.filter(status=Link.Status.SCRAPED)
+        if options["dates"]:
+            count = self._reindex_dates(queryset, options["all"], options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Normalised the published dates of {count} news"))
+            return
+
+        if not options["all"]:
+            queryset = queryset.filter(search_vector__isnull=True)
+
+        batch = []
+        count = 0
+        for link in queryset.only("id", "title", "body").iterator(chunk_size=options["batch_size"]):
+            link.search_vector = search_vector(link.title, link.body)
+            batch.append(link)
+            if len(batch) >= options["batch_size"]:
+                count += self._save(batch)
+                batch = []
+        count += self._save(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {count} news"))
+
+    def _save(self, batch):
+        Link.objects.bulk_update(batch, ["search_vector"])
+        return len(batch)
+
+    def _reindex_dates(self, queryset, rebuild_all, batch_size):
+        queryset = queryset.exclude(published_raw="")
+        if not rebuild_all:
+            queryset = queryset.filter(published_at__isnull=True)
+
+        batch = []
+        count = 0
+        for link in queryset.only("id", "source", "published_raw", "published_at").iterator(chunk_size=batch_size):
+            batch.append(link)
+            if len(batch) >= batch_size:
+                count += self._save_dates(batch)
+                batch = []
+        count += self._save_dates(batch)
+        return count
+
+    def _save_dates(self, batch):
+        by_source = defaultdict(list)
+        for link in batch:
+            by_source[link.source].append(link)
+
+        changed = []
+        now = timezone.now()
+        for source, links in by_source.items():
+            # Each site's dates are converted in one batch with its compiled rules
+            rules = (get_extractor(source) or SiteExtractor).rules()
+            published = rules.parse_published_many([link.published_raw for link in links])
+            for link, published_at in zip(links, published):
+                if published_at != link.published_at:
+                    changed.append((link, link.published_at))
+                    link.published_at = published_at
+                    link.updated_at = now
+
+        Link.objects.bulk_update([link for link, _ in changed], ["published_at", "updated_at"])
+        for link, previous_published_at in changed:
+            invalidate_news(link.id, previous_published_at, link.published_at)
+        return len(changed)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from app.services.snapshot_service import write_snapshots
+
+
+class Command(BaseCommand):
+    help = "Write the daily partitioned Parquet snapshot of scraped news, only changed days unless --full"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Rewrite the partition of every day")
+        parser.add_argument("--batch-size", type=int, default=10000, help="Rows per Parquet row group")
+
+    def handle(self, *args, **options):
+        days = write_snapshots(full=options["full"], batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote the snapshots of {len(days)} days"))
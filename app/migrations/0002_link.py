@@ -0,0 +1,35 @@
+# Generated by Django 4.1.5 on 2026-10-18 13:18
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Link',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.TextField()),
+                ('url_hash', models.CharField(max_length=64, unique=True)),
+                ('source', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('scraped', 'Scraped'), ('invalid', 'Invalid'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Link',
+                'verbose_name_plural': 'Links',
+                'db_table': 'links',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='link',
+            index=models.Index(fields=['source', 'status'], name='links_source_status_idx'),
+        ),
+    ]
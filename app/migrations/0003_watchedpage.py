@@ -0,0 +1,30 @@
+# Generated by Django 4.1.5 on 2026-10-18 13:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_link'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WatchedPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=500, unique=True)),
+                ('etag', models.CharField(blank=True, default='', max_length=255)),
+                ('last_modified', models.CharField(blank=True, default='', max_length=64)),
+                ('fingerprint', models.CharField(blank=True, default='', max_length=64)),
+                ('checked_at', models.DateTimeField(blank=True, null=True)),
+                ('changed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Watched Page',
+                'verbose_name_plural': 'Watched Pages',
+                'db_table': 'watched_pages',
+            },
+        ),
+    ]
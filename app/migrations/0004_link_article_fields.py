@@ -0,0 +1,38 @@
+# Generated by Django 4.1.5 on 2026-10-18 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0003_watchedpage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='link',
+            name='body',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='page_source',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='published_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='published_raw',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='title',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.1.5 on 2026-10-18 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_link_article_fields'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='link',
+            name='page_source',
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='page_source_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.1.5 on 2026-10-18 13:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_link_page_source_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='link',
+            index=models.Index(condition=models.Q(('status', 'scraped')), fields=['published_at', 'id'], name='links_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='link',
+            index=models.Index(condition=models.Q(('status', 'scraped')), fields=['source', 'published_at', 'id'], name='links_source_published_idx'),
+        ),
+    ]
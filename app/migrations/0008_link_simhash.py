@@ -0,0 +1,44 @@
+# Generated by Django 4.1.5 on 2026-10-18 13:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_link_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='link',
+            name='canonical',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='app.link'),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='simhash_band_0',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='simhash_band_1',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='simhash_band_2',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='simhash_band_3',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.1.5 on 2026-10-18 13:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0008_link_simhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='watchedpage',
+            name='interval',
+            field=models.PositiveIntegerField(default=60),
+        ),
+        migrations.AddField(
+            model_name='watchedpage',
+            name='next_check_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
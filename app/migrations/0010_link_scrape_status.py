@@ -0,0 +1,28 @@
+# Generated by Django 4.1.5 on 2026-10-18 13:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_watchedpage_interval'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='link',
+            name='last_error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='scrape_attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='link',
+            name='scraped_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
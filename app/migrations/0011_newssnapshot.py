@@ -0,0 +1,28 @@
+# Generated by Django 4.1.5 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_link_scrape_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('max_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('written_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'News Snapshot',
+                'verbose_name_plural': 'News Snapshots',
+                'db_table': 'news_snapshots',
+            },
+        ),
+    ]
@@ -1 +1,4 @@
 from .user import User, CustomUserManager, AbstractBaseUser
+from .link import Link
+from .watched_page import WatchedPage
+from .news_snapshot import NewsSnapshot
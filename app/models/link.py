@@ -0,0 +1,74 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Link(models.Model):
+    """A news link discovered on the front page of a portal"""
+
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Pending")
+        SCRAPED = "scraped", _("Scraped")
+        INVALID = "invalid", _("Invalid")
+        FAILED = "failed", _("Failed")
+
+    url = models.TextField()
+    # sha256 of the normalized url, the unique index makes re-discovered links a no-op on insert
+    url_hash = models.CharField(max_length=64, unique=True)
+    source = models.CharField(max_length=255)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+
+    # Filled in when the article behind the link is scraped
+    title = models.TextField(blank=True, default="")
+    published_raw = models.CharField(max_length=100, blank=True, default="")
+    published_at = models.DateTimeField(null=True, blank=True)
+    body = models.TextField(blank=True, default="")
+    # sha256 of the raw html kept in the html archive, only set when SCRAPER_STORE_RAW_HTML is enabled
+    page_source_hash = models.CharField(max_length=64, blank=True, default="")
+    # Lexemes of title (weight A) and body (weight B), built by app.utils.devanagari when the article is scraped
+    search_vector = SearchVectorField(null=True, blank=True)
+
+    # SimHash of the body and its four 16 bit bands, equal bands find near duplicate candidates
+    simhash = models.BigIntegerField(null=True, blank=True)
+    simhash_band_0 = models.IntegerField(null=True, blank=True, db_index=True)
+    simhash_band_1 = models.IntegerField(null=True, blank=True, db_index=True)
+    simhash_band_2 = models.IntegerField(null=True, blank=True, db_index=True)
+    simhash_band_3 = models.IntegerField(null=True, blank=True, db_index=True)
+    # First scraped copy of the same story, null for the canonical news itself
+    canonical = models.ForeignKey(
+        "self", null=True, blank=True, on_delete=models.SET_NULL, related_name="duplicates"
+    )
+
+    # Outcome of the scrape tasks, celery results are not kept
+    scraped_at = models.DateTimeField(null=True, blank=True)
+    scrape_attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "links"
+        verbose_name = "Link"
+        verbose_name_plural = "Links"
+        app_label = "app"
+        indexes = [
+            models.Index(fields=["source", "status"], name="links_source_status_idx"),
+            # Keyset pagination of the news api, newest first, optionally per source
+            models.Index(
+                fields=["published_at", "id"],
+                name="links_published_idx",
+                condition=models.Q(status="scraped"),
+            ),
+            models.Index(
+                fields=["source", "published_at", "id"],
+                name="links_source_published_idx",
+                condition=models.Q(status="scraped"),
+            ),
+            GinIndex(fields=["search_vector"], name="links_search_vector_idx"),
+        ]
+
+    def __str__(self):
+        return self.url
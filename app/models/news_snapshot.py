@@ -0,0 +1,20 @@
+from django.db import models
+
+
+class NewsSnapshot(models.Model):
+    """The Parquet partition written for one published date, with the state of the links it was written from"""
+
+    day = models.DateField(unique=True)
+    row_count = models.PositiveIntegerField(default=0)
+    # latest updated_at of the links of the day, a newer one means the partition is stale
+    max_updated_at = models.DateTimeField(null=True, blank=True)
+    written_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "news_snapshots"
+        verbose_name = "News Snapshot"
+        verbose_name_plural = "News Snapshots"
+        app_label = "app"
+
+    def __str__(self):
+        return str(self.day)
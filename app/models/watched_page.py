@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class WatchedPage(models.Model):
+    """A portal front page watched for changes, with the validators of its last fetch"""
+
+    url = models.URLField(max_length=500, unique=True)
+    etag = models.CharField(max_length=255, blank=True, default="")
+    last_modified = models.CharField(max_length=64, blank=True, default="")
+    # sha256 of the sorted set of links found on the page
+    fingerprint = models.CharField(max_length=64, blank=True, default="")
+
+    checked_at = models.DateTimeField(null=True, blank=True)
+    changed_at = models.DateTimeField(null=True, blank=True)
+
+    # seconds between checks, shortened when the page changes and stretched when it does not
+    interval = models.PositiveIntegerField(default=60)
+    next_check_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "watched_pages"
+        verbose_name = "Watched Page"
+        verbose_name_plural = "Watched Pages"
+        app_label = "app"
+
+    def __str__(self):
+        return self.url
@@ -0,0 +1,179 @@
+import base64
+import datetime as dt
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQueryField, SearchRank
+from django.core.cache import cache
+from django.db.models import BooleanField, F, Func, Q, Value
+from django.db.models.functions import Cast
+from django.utils import dateparse, timezone
+from rest_framework import serializers
+
+from app.models.link import Link
+from app.utils.devanagari import tsquery_literal
+from app.utils.news_cache import cache_timeout, detail_cache_key, list_cache_key
+
+# Columns returned by the listing, the body and archive hash are only loaded on request
+LIST_FIELDS = ("id", "url", "source", "title", "published_at", "canonical_id")
+DETAIL_FIELDS = LIST_FIELDS + ("published_raw", "body")
+
+
+def encode_cursor(row):
+    value = f"{row['published_at'].isoformat()}|{row['id']}"
+    return base64.urlsafe_b64encode(value.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        published_at, link_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        published_at = dateparse.parse_datetime(published_at)
+        link_id = int(link_id)
+    except (ValueError, UnicodeError):
+        published_at = None
+
+    if published_at is None:
+        raise serializers.ValidationError({"cursor": "Cursor is invalid."})
+    return published_at, link_id
+
+
+def day_start(date):
+    return timezone.make_aware(dt.datetime.combine(date, dt.time.min))
+
+
+def news_queryset(date_from, date_to, source=None, canonical_only=False):
+    """
+    Scraped news published between the two local dates, both inclusive.
+
+    With `canonical_only` republished copies of a story from other portals are left out.
+    """
+    queryset = Link.objects.filter(
+        status=Link.Status.SCRAPED,
+        published_at__gte=day_start(date_from),
+        published_at__lt=day_start(date_to + dt.timedelta(days=1)),
+    )
+    if source:
+        queryset = queryset.filter(source=source)
+    if canonical_only:
+        queryset = queryset.filter(canonical__isnull=True)
+    return queryset
+
+
+async def news_list(date_from, date_to, source=None, cursor=None, limit=50, include_body=False, canonical_only=False):
+    """
+    One page of news, newest first.
+
+    Pages are cut with a keyset on (published_at, id) instead of OFFSET, so the
+    n-th page is read from the index as cheaply as the first one.
+    """
+    queryset = news_queryset(date_from, date_to, source, canonical_only)
+
+    if cursor:
+        published_at, link_id = decode_cursor(cursor)
+        # (published_at, id) < cursor, the first condition bounds the index range scan
+        queryset = queryset.filter(published_at__lte=published_at).filter(
+            Q(published_at__lt=published_at) | Q(id__lt=link_id)
+        )
+
+    fields = LIST_FIELDS + ("body",) if include_body else LIST_FIELDS
+    rows = [row async for row in queryset.order_by("-published_at", "-id").values(*fields)[:limit + 1]]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+
+    return {"data": rows, "next_cursor": next_cursor}
+
+
+def _export_queryset(date_from, date_to, source, canonical_only):
+    return news_queryset(date_from, date_to, source, canonical_only).order_by("published_at", "id").values(*DETAIL_FIELDS)
+
+
+def export_news(date_from, date_to, source=None, canonical_only=False, chunk_size=2000):
+    """
+    Every news of the date range with its body, oldest first, as an iterator of dicts.
+
+    Rows are read through a server side cursor `chunk_size` at a time, so an
+    export of any length runs in constant memory.
+    """
+    return _export_queryset(date_from, date_to, source, canonical_only).iterator(chunk_size=chunk_size)
+
+
+def aexport_news(date_from, date_to, source=None, canonical_only=False, chunk_size=2000):
+    """`export_news` as an async iterator, each chunk is fetched off the event loop."""
+    return _export_queryset(date_from, date_to, source, canonical_only).aiterator(chunk_size=chunk_size)
+
+
+class Matches(Func):
+    """`vector @@ query`"""
+
+    arg_joiner = " @@ "
+    template = "%(expressions)s"
+    output_field = BooleanField()
+
+
+async def search_news(query, limit=20, date_from=None, date_to=None, source=None):
+    """
+    Best matching news for a keyword query.
+
+    The query is tokenized exactly like the stored search vectors, so matching
+    and ranking only read the GIN index and never parse article text.
+    """
+    tsquery = tsquery_literal(query)
+    if not tsquery:
+        return []
+
+    queryset = Link.objects.filter(status=Link.Status.SCRAPED)
+    if date_from and date_to:
+        queryset = news_queryset(date_from, date_to, source)
+    elif source:
+        queryset = queryset.filter(source=source)
+
+    search_query = Cast(Value(tsquery), SearchQueryField())
+    queryset = (
+        queryset.filter(Matches(F("search_vector"), search_query))
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+        .order_by("-rank", "-published_at")
+        .values(*LIST_FIELDS, "rank")[:limit]
+    )
+    return [row async for row in queryset]
+
+
+async def news_detail(news_id):
+    news = await Link.objects.filter(id=news_id, status=Link.Status.SCRAPED).values(*DETAIL_FIELDS).afirst()
+    if news is None:
+        return None
+
+    # Every copy of the story, on the canonical news and its duplicates alike
+    cluster_id = news["canonical_id"] or news["id"]
+    duplicates = (
+        Link.objects.filter(Q(id=cluster_id) | Q(canonical_id=cluster_id), status=Link.Status.SCRAPED)
+        .exclude(id=news_id)
+        .order_by("published_at", "id")
+        .values("id", "url", "source", "title", "published_at")
+    )
+    news["duplicates"] = [row async for row in duplicates]
+    return news
+
+
+async def cached_news_list(**params):
+    """news_list served from the cache, entries are invalidated per published date by the scraper."""
+    key = await list_cache_key(params)
+    if key is None:
+        return await news_list(**params)
+
+    result = await cache.aget(key)
+    if result is None:
+        result = await news_list(**params)
+        await cache.aset(key, result, cache_timeout(params["date_to"]))
+    return result
+
+
+async def cached_news_detail(news_id):
+    key = detail_cache_key(news_id)
+    news = await cache.aget(key)
+    if news is None:
+        news = await news_detail(news_id)
+        if news is not None:
+            await cache.aset(key, news, settings.NEWS_CACHE_TTL_PAST)
+    return news
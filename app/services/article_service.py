@@ -0,0 +1,176 @@
+import logging
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models import Value
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from app.extractors import get_extractor
+from app.models.link import Link
+from app.services.dedup_service import BAND_FIELDS, assign_cluster
+from app.utils.devanagari import tsvector_literal
+from app.utils.extraction import parse_article
+from app.utils.html_archive import get_html_archive
+from app.utils.metrics import ARTICLE_EXTRACT_SECONDS
+from app.utils.news_cache import invalidate_news, invalidate_news_details
+from app.utils.rate_limiter import RateLimited
+from app.utils.scrapers import fetch_stream, requires_js
+from app.utils.urls import site_of
+
+logger = logging.getLogger(__name__)
+
+
+def _extract(url, rules, force_selenium=False):
+    """Parse the article at `url`, archiving the raw html on the way when enabled."""
+    started = time.perf_counter()
+    stream = fetch_stream(url, force_selenium=force_selenium)
+    try:
+        return _parse(url, stream, rules)
+    finally:
+        # Labelled with the method that fetched the page, http falls back to selenium
+        ARTICLE_EXTRACT_SECONDS.labels(domain=site_of(url), method=stream.method).observe(
+            time.perf_counter() - started
+        )
+
+
+def _parse(url, stream, rules):
+    if not settings.SCRAPER_STORE_RAW_HTML:
+        return parse_article(stream, url, rules=rules), ""
+
+    writer = get_html_archive().writer()
+    try:
+        article = parse_article(stream, url, writer, rules)
+    except BaseException:
+        writer.discard()
+        raise
+
+    if not article.body:
+        writer.discard()
+        return article, ""
+    return article, writer.commit()
+
+
+def search_vector(title, body):
+    """tsvector of an article, built in python so Devanagari words are not split by the postgres parser."""
+    return Cast(Value(tsvector_literal((title, "A"), (body, "B"))), SearchVectorField())
+
+
+STATUS_FIELDS = ("status", "scrape_attempts", "last_error", "updated_at")
+SCRAPED_FIELDS = (
+    "title", "published_raw", "published_at", "body", "page_source_hash", "search_vector",
+    "simhash", *BAND_FIELDS, "canonical", "scraped_at", *STATUS_FIELDS,
+)
+
+
+def extract_link(link, extractor):
+    """
+    Scrape the article behind `link` with the rules of `extractor` and set the extracted fields, without saving.
+
+    Links without any article body are marked invalid. Returns the fields to save.
+    """
+    link.scrape_attempts += 1
+    rules = extractor.rules()
+    js_required = extractor.js_required or requires_js(link.url)
+    article, page_source_hash = _extract(link.url, rules, force_selenium=js_required)
+
+    # A server rendered page without body text is most likely rendered client side
+    if not article.body and not js_required:
+        logger.info(f"No article body found over HTTP for {link.url}, retrying with selenium")
+        article, page_source_hash = _extract(link.url, rules, force_selenium=True)
+
+    link.updated_at = timezone.now()
+    link.last_error = ""
+    if not article.body:
+        link.status = Link.Status.INVALID
+        return STATUS_FIELDS
+
+    link.title = article.title
+    link.published_raw = article.published_raw
+    link.published_at = article.published_at
+    link.body = article.body
+    link.page_source_hash = page_source_hash
+    link.search_vector = search_vector(article.title, article.body)
+    assign_cluster(link, article.body)
+    link.status = Link.Status.SCRAPED
+    link.scraped_at = link.updated_at
+    return SCRAPED_FIELDS
+
+
+def _invalidate(scraped):
+    """Drop the cached listings and details showing the `(link, previous published_at)` pairs."""
+    detail_ids = set()
+    for link, previous_published_at in scraped:
+        invalidate_news(link.id, previous_published_at, link.published_at)
+        if link.canonical_id:
+            # Every news of the cluster lists the new duplicate
+            detail_ids.add(link.canonical_id)
+            detail_ids.update(Link.objects.filter(canonical_id=link.canonical_id).values_list("id", flat=True))
+    if detail_ids:
+        invalidate_news_details(detail_ids)
+
+
+def scrape_link(link, extractor):
+    """Scrape the article behind `link` and save it."""
+    previous_published_at = link.published_at
+    update_fields = extract_link(link, extractor)
+    link.save(update_fields=update_fields)
+
+    if link.status == Link.Status.SCRAPED:
+        _invalidate([(link, previous_published_at)])
+    return link
+
+
+def scrape_links(links):
+    """
+    Scrape a batch of links one after the other and save them with one bulk_update per outcome.
+
+    The batch shares the keep-alive HTTP session and driver pool of the worker.
+    Links of a rate limited domain are skipped, returns their ids with the
+    seconds to wait before trying them again.
+    """
+    outcomes = defaultdict(list)
+    scraped = []
+    deferred = []
+    retry_after = 0
+    limited = set()
+
+    for link in links:
+        if link.source in limited:
+            deferred.append(link.id)
+            continue
+
+        extractor = get_extractor(link.source)
+        if extractor is None:
+            link.status = Link.Status.INVALID
+            link.updated_at = timezone.now()
+            outcomes[STATUS_FIELDS].append(link)
+            continue
+
+        previous_published_at = link.published_at
+        try:
+            update_fields = extract_link(link, extractor)
+        except RateLimited as exc:
+            limited.add(link.source)
+            deferred.append(link.id)
+            retry_after = max(retry_after, exc.retry_after)
+            continue
+        except Exception as exc:
+            logger.exception(f"Scraping {link.url} failed")
+            link.status = Link.Status.FAILED
+            link.last_error = repr(exc)
+            link.updated_at = timezone.now()
+            outcomes[STATUS_FIELDS].append(link)
+            continue
+
+        outcomes[update_fields].append(link)
+        if link.status == Link.Status.SCRAPED:
+            scraped.append((link, previous_published_at))
+
+    for update_fields, batch in outcomes.items():
+        Link.objects.bulk_update(batch, update_fields)
+
+    _invalidate(scraped)
+    return deferred, retry_after
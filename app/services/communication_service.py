@@ -1,29 +1,19 @@
-import threading
 import datetime as dt
 from environs import Env
-from django.conf import settings
 from django.utils import timezone
 from django.utils.encoding import force_bytes
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.http import urlsafe_base64_encode
 
+from app.tasks.send_email_task import send_email
+
 env = Env()
 env.read_env()
 
 DASHBOARD_FRONTEND_DOMAIN = env("DASHBOARD_FRONTEND_DOMAIN")
 
 
-class EmailThread(threading.Thread):
-    def __init__(self, email):
-        self.email = email
-        threading.Thread.__init__(self)
-
-    def run(self):
-        self.email.send()
-
-
 def send_activation_email(user, token):
     expiry_date = timezone.now() + dt.timedelta(days=5)
     email_subject = "Activate your account"
@@ -39,14 +29,8 @@ def send_activation_email(user, token):
         },
     )
 
-    email = EmailMultiAlternatives(
-        subject=email_subject,
-        from_email=settings.EMAIL_FROM_USER,
-        to=[user.email],
-    )
-    email.attach_alternative(email_body, "text/html")
-
-    EmailThread(email).start()
+    # Sent by the email worker so the request never waits on SMTP
+    send_email.delay(email_subject, email_body, [user.email])
 
 
 def send_reset_password_email(user, token):
@@ -64,12 +48,6 @@ def send_reset_password_email(user, token):
         },
     )
 
-    email = EmailMultiAlternatives(
-        subject=email_subject,
-        from_email=settings.EMAIL_FROM_USER,
-        to=[user.email],
-    )
-    email.attach_alternative(email_body, "text/html")
-
-    EmailThread(email).start()
+    # Sent by the email worker so the request never waits on SMTP
+    send_email.delay(email_subject, email_body, [user.email])
 
@@ -0,0 +1,64 @@
+import datetime as dt
+
+from django.conf import settings
+from django.db.models import Q
+
+from app.models.link import Link
+from app.utils.devanagari import tokenize
+from app.utils.metrics import DEDUP_CHECKS
+from app.utils.simhash import bands, hamming_distance, simhash, to_signed, to_unsigned
+
+BAND_FIELDS = [f"simhash_band_{band}" for band in range(4)]
+
+
+def find_canonical(link, signature):
+    """
+    Return the id of the canonical news `link` is a near duplicate of, or None.
+
+    Candidates sharing a band are fetched with one indexed query, limited to news
+    published around the same time, and compared by hamming distance.
+    """
+    lookup = Q()
+    for field, value in zip(BAND_FIELDS, bands(signature)):
+        lookup |= Q(**{field: value})
+
+    candidates = Link.objects.filter(lookup, status=Link.Status.SCRAPED).exclude(id=link.id)
+    if link.published_at is not None:
+        window = dt.timedelta(days=settings.NEAR_DUPLICATE_WINDOW_DAYS)
+        candidates = candidates.filter(
+            published_at__gte=link.published_at - window,
+            published_at__lte=link.published_at + window,
+        )
+
+    best = None
+    for candidate in candidates.values("id", "simhash", "canonical_id"):
+        cluster_id = candidate["canonical_id"] or candidate["id"]
+        # A re-scraped canonical news must not join the cluster it leads
+        if cluster_id == link.id:
+            continue
+
+        distance = hamming_distance(signature, to_unsigned(candidate["simhash"]))
+        if distance <= settings.NEAR_DUPLICATE_MAX_DISTANCE and (best is None or distance < best[0]):
+            best = (distance, cluster_id)
+
+    return best[1] if best is not None else None
+
+
+def assign_cluster(link, body):
+    """
+    Set the simhash fields of `link` and point it to the canonical copy of its story, without saving.
+
+    A re-scraped news which other news already point to stays canonical, clusters
+    are only ever one level deep.
+    """
+    signature = simhash(tokenize(body))
+
+    link.simhash = to_signed(signature)
+    for field, value in zip(BAND_FIELDS, bands(signature)):
+        setattr(link, field, value)
+    if link.id is not None and Link.objects.filter(canonical_id=link.id).exists():
+        link.canonical_id = None
+    else:
+        link.canonical_id = find_canonical(link, signature)
+    DEDUP_CHECKS.labels(result="duplicate" if link.canonical_id else "unique").inc()
+    return link
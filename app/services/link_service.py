@@ -0,0 +1,34 @@
+from app.models.link import Link
+from app.utils.seen_filter import get_seen_index
+from app.utils.urls import url_hash
+
+
+def save_links(source, urls, batch_size=1000):
+    """
+    Save the links discovered on `source` and return the ids of the new ones.
+
+    Links are checked against the seen url index first, so already known links
+    never reach the database. The others are written with a single bulk insert,
+    the unique index on url_hash is the source of truth for duplicates. Only
+    then are they marked as seen, a failed insert leaves them to the next run.
+
+    Marking tells which worker got to a link first, the others do not queue it.
+    Links the index forgot, e.g. after a crash before marking, are only returned
+    again while they are still pending.
+    """
+    urls_by_hash = {url_hash(url): url for url in urls}
+
+    index = get_seen_index()
+    unseen = index.unseen(list(urls_by_hash))
+    if not unseen:
+        return []
+
+    links = [Link(url=urls_by_hash[h], url_hash=h, source=source) for h in unseen]
+    Link.objects.bulk_create(links, batch_size=batch_size, ignore_conflicts=True)
+
+    new_hashes = index.mark_seen(unseen)
+    if not new_hashes:
+        return []
+    return list(
+        Link.objects.filter(url_hash__in=new_hashes, status=Link.Status.PENDING).values_list("id", flat=True)
+    )
@@ -0,0 +1,114 @@
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+from django.db.models import Count, Max
+from django.db.models.functions import TruncDate
+
+from app.models.link import Link
+from app.models.news_snapshot import NewsSnapshot
+from app.selectors.news_selector import news_queryset
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = pa.schema([
+    ("id", pa.int64()),
+    ("source", pa.string()),
+    ("url", pa.string()),
+    ("title", pa.string()),
+    ("published_at", pa.timestamp("us", tz="UTC")),
+    ("body", pa.string()),
+    ("canonical_id", pa.int64()),
+])
+
+
+def partition_path(day):
+    """Hive style partition of a published date, readable with pyarrow.dataset(root, partitioning="hive")."""
+    return Path(settings.NEWS_SNAPSHOT_ROOT) / f"published_date={day.isoformat()}"
+
+
+def day_states():
+    """`{published date: (row count, latest updated_at)}` of the scraped links, grouped by local date."""
+    rows = (
+        Link.objects.filter(status=Link.Status.SCRAPED, published_at__isnull=False)
+        .annotate(day=TruncDate("published_at"))
+        .values("day")
+        .annotate(row_count=Count("id"), max_updated_at=Max("updated_at"))
+        .order_by()
+    )
+    return {row["day"]: (row["row_count"], row["max_updated_at"]) for row in rows}
+
+
+def changed_days(states=None):
+    """Days whose links differ from their snapshot, and days whose links are all gone."""
+    states = day_states() if states is None else states
+    snapshots = {
+        snapshot.day: (snapshot.row_count, snapshot.max_updated_at) for snapshot in NewsSnapshot.objects.all()
+    }
+    changed = sorted(day for day, state in states.items() if snapshots.get(day) != state)
+    removed = sorted(set(snapshots) - set(states))
+    return changed, removed
+
+
+def write_day(day, batch_size):
+    """Write the links of `day` to its partition, one row group per `batch_size` rows."""
+    path = partition_path(day)
+    path.mkdir(parents=True, exist_ok=True)
+    tmp = path / "part-0.parquet.tmp"
+
+    rows = (
+        news_queryset(day, day)
+        .order_by("published_at", "id")
+        .values(*SCHEMA.names)
+        .iterator(chunk_size=batch_size)
+    )
+
+    count = 0
+    with pq.ParquetWriter(tmp, SCHEMA, compression="zstd") as writer:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=SCHEMA))
+                count += len(batch)
+                batch = []
+        if batch or not count:
+            writer.write_table(pa.Table.from_pylist(batch, schema=SCHEMA))
+            count += len(batch)
+
+    # Readers never see a half written partition
+    os.replace(tmp, path / "part-0.parquet")
+    return count
+
+
+def write_snapshots(full=False, batch_size=10000):
+    """
+    Bring the Parquet snapshot up to date and return the days which were written.
+
+    Only days with new, changed or removed links are rewritten, the partitions
+    of the other days are left untouched.
+    """
+    states = day_states()
+    if full:
+        changed = sorted(states)
+        removed = sorted(set(NewsSnapshot.objects.values_list("day", flat=True)) - set(states))
+    else:
+        changed, removed = changed_days(states)
+
+    for day in changed:
+        count = write_day(day, batch_size)
+        row_count, max_updated_at = states[day]
+        NewsSnapshot.objects.update_or_create(
+            day=day, defaults={"row_count": row_count, "max_updated_at": max_updated_at}
+        )
+        logger.info(f"Wrote snapshot of {day} with {count} news")
+
+    for day in removed:
+        shutil.rmtree(partition_path(day), ignore_errors=True)
+    NewsSnapshot.objects.filter(day__in=removed).delete()
+
+    return changed
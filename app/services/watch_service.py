@@ -0,0 +1,68 @@
+import datetime as dt
+import hashlib
+
+from django.conf import settings
+from django.utils import timezone
+
+from app.models.watched_page import WatchedPage
+
+
+def link_fingerprint(links):
+    """Hash of the link set of a page, independent of link order and markup noise."""
+    return hashlib.sha256("\n".join(sorted(set(links))).encode("utf-8")).hexdigest()
+
+
+def get_watched_pages(urls):
+    """Return `{url: WatchedPage}`, creating the rows of newly configured urls."""
+    WatchedPage.objects.bulk_create([WatchedPage(url=url) for url in urls], ignore_conflicts=True)
+    return {page.url: page for page in WatchedPage.objects.filter(url__in=urls)}
+
+
+def due_pages(pages):
+    """The watched pages whose next check is due."""
+    now = timezone.now()
+    return {url: page for url, page in pages.items() if page.next_check_at is None or page.next_check_at <= now}
+
+
+def next_interval(interval, changed):
+    """Halve the polling interval of a page that changed, stretch it by half when it did not."""
+    interval = interval / 2 if changed else interval * 1.5
+    return int(min(settings.WATCH_MAX_INTERVAL, max(settings.WATCH_MIN_INTERVAL, interval)))
+
+
+CHECK_FIELDS = ("checked_at", "etag", "last_modified", "fingerprint", "changed_at", "interval", "next_check_at")
+
+
+def record_check(page, result, links=None):
+    """
+    Set the outcome of fetching a watched page on `page` and return whether it changed.
+
+    A 304 or an unchanged link fingerprint counts as no change. The next check
+    is scheduled from the adapted interval, so busy portals are polled every
+    WATCH_MIN_INTERVAL and quiet ones drift towards WATCH_MAX_INTERVAL.
+
+    Nothing is saved, the caller saves the page with `save_check` once the links
+    of a changed page are stored and queued. A failure in between leaves the old
+    validators and fingerprint in place and the next poll handles the page again.
+    """
+    now = timezone.now()
+    page.checked_at = now
+
+    changed = False
+    if not result.not_modified:
+        page.etag = result.etag
+        page.last_modified = result.last_modified
+
+        fingerprint = link_fingerprint(links or [])
+        if fingerprint != page.fingerprint:
+            page.fingerprint = fingerprint
+            page.changed_at = now
+            changed = True
+
+    page.interval = next_interval(page.interval, changed)
+    page.next_check_at = now + dt.timedelta(seconds=page.interval)
+    return changed
+
+
+def save_check(page):
+    page.save(update_fields=CHECK_FIELDS)
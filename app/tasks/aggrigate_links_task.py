@@ -1,8 +1,23 @@
+import logging
+
+from celery import group
+from django.conf import settings
+
 from config import celery_app
-from app.utils.scrapers import scrape
+from app.extractors import get_extractor
+from app.services.link_service import save_links
+from app.services.watch_service import due_pages, get_watched_pages, record_check, save_check
+from app.tasks.scrape_article_task import scrape_articles_batch
+from app.utils.crawler import crawl
+from app.utils.extraction import extract_links
+from app.utils.locks import singleton_task
+from app.utils.metrics import LINK_EXTRACT_SECONDS, LINKS_DISCOVERED, LINKS_NEW
+from app.utils.scrapers import fetch
+from app.utils.urls import site_of
 
+logger = logging.getLogger(__name__)
 
-#add news url here
+#add news url here, each site needs an extractor in NEWS_EXTRACTORS
 urls = [
     "https://www.onlinekhabar.com",
     "https://ekantipur.com"
@@ -10,13 +25,62 @@ urls = [
 
 
 
+# Beat fires every WATCH_MIN_INTERVAL, only the portals which are due are crawled
+# and a run is skipped while the previous one is still going
+
 @celery_app.task()
+@singleton_task(timeout=settings.CRAWLER_TIMEOUT * 4)
 def aggrigate_links_task():
 
-    for website in urls:
-        page_source = scrape("")
+    watched_pages = due_pages(get_watched_pages(urls))
+    if not watched_pages:
+        return
+
+    def conditional_fetch(url):
+        page = watched_pages[url]
+        return fetch(url, etag=page.etag, last_modified=page.last_modified)
+
+    # All portals are fetched concurrently, portals which failed or timed out are None
+    results = crawl(list(watched_pages), fetch=conditional_fetch)
+
+    for website, result in results.items():
+        if result is None:
+            continue
+
+        page = watched_pages[website]
+
+        # Nothing to do when the portal answered 304
+        if result.not_modified:
+            record_check(page, result)
+            save_check(page)
+            continue
+
+        site = site_of(website)
+        extractor = get_extractor(site)
+        if extractor is None:
+            # Still recorded, so the page backs off to WATCH_MAX_INTERVAL instead of being fetched on every tick
+            logger.warning(f"No extractor for {site}, add one to NEWS_EXTRACTORS")
+            record_check(page, result)
+            save_check(page)
+            continue
+
+        with LINK_EXTRACT_SECONDS.labels(domain=site).time():
+            links = extract_links(result.page_source, website, extractor)
+        LINKS_DISCOVERED.labels(domain=site).inc(len(links))
 
+        # Skip saving when the set of links on the front page is the same as last time
+        if not record_check(page, result, links):
+            save_check(page)
+            continue
 
+        # Only links missing from the seen url index are inserted and scraped, in chunks
+        link_ids = save_links(site, links)
+        LINKS_NEW.labels(domain=site).inc(len(link_ids))
+        size = settings.SCRAPE_BATCH_SIZE
+        if link_ids:
+            group(
+                scrape_articles_batch.s(link_ids[start:start + size]) for start in range(0, len(link_ids), size)
+            ).apply_async()
 
-    # TODO 
-    # Loop through each website and extract links and save in database
+        # Only now, a failure above leaves the page to be handled again on the next poll
+        save_check(page)
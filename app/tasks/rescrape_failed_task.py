@@ -0,0 +1,38 @@
+import datetime as dt
+
+from django.conf import settings
+from django.utils import timezone
+
+from config import celery_app
+from app.models.link import Link
+from app.tasks.scrape_article_task import scrape_article
+from app.utils.locks import singleton_task
+
+
+# Links which failed because of a network or selenium problem are tried again
+# on the rescrape queue, so they never compete with fresh articles. Links left
+# pending, e.g. when queueing their batch failed after they were saved, are
+# picked up the same way. A run is skipped while the previous one is still
+# queueing, so the same links are never queued twice
+
+@celery_app.task()
+@singleton_task(timeout=settings.RESCRAPE_LOCK_TIMEOUT)
+def rescrape_failed_task():
+
+    now = timezone.now()
+    failed_before = now - dt.timedelta(minutes=settings.RESCRAPE_FAILED_AFTER_MINUTES)
+    link_ids = list(
+        Link.objects.filter(
+            status__in=[Link.Status.FAILED, Link.Status.PENDING],
+            updated_at__lt=failed_before,
+            scrape_attempts__lt=settings.RESCRAPE_MAX_ATTEMPTS,
+        )
+        .order_by("-id")
+        .values_list("id", flat=True)[:settings.RESCRAPE_BATCH_SIZE]
+    )
+
+    for link_id in link_ids:
+        scrape_article.apply_async((link_id,), queue="rescrape", priority=9)
+
+    # A pending link still waiting in a busy queue is not queued again on every run
+    Link.objects.filter(id__in=link_ids, status=Link.Status.PENDING).update(updated_at=now)
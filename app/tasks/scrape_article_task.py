@@ -0,0 +1,54 @@
+from django.db.models import F
+from django.utils import timezone
+
+from config import celery_app
+from app.extractors import get_extractor
+from app.models.link import Link
+from app.services.article_service import scrape_link, scrape_links
+from app.utils.rate_limiter import RateLimited
+
+
+# This job is called for every new link found on a portal
+# and can also called if failed due system issue
+
+@celery_app.task(bind=True, max_retries=None)
+def scrape_article(self, link_id):
+
+    link = Link.objects.filter(id=link_id).first()
+    if link is None:
+        return
+
+    # The extractor of the site is picked from the registry by the source of the link
+    extractor = get_extractor(link.source)
+    if extractor is None:
+        link.status = Link.Status.INVALID
+        link.save(update_fields=["status", "updated_at"])
+        return
+
+    try:
+        scrape_link(link, extractor)
+    except RateLimited as exc:
+        # Give the worker back for other domains instead of sleeping until a token is free
+        raise self.retry(countdown=exc.retry_after)
+    except Exception as exc:
+        Link.objects.filter(id=link_id).update(
+            status=Link.Status.FAILED,
+            scrape_attempts=F("scrape_attempts") + 1,
+            last_error=repr(exc),
+            updated_at=timezone.now(),
+        )
+        raise
+
+
+# New links of a front page are scraped in chunks, one task loads and saves a whole chunk
+
+@celery_app.task(bind=True, max_retries=None)
+def scrape_articles_batch(self, link_ids):
+
+    links = list(Link.objects.filter(id__in=link_ids).order_by("id"))
+
+    deferred, retry_after = scrape_links(links)
+
+    # Only the links of rate limited domains are tried again
+    if deferred:
+        raise self.retry(args=(deferred,), countdown=retry_after)
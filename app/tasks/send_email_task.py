@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+
+from config import celery_app
+
+
+@celery_app.task(autoretry_for=(OSError,), retry_backoff=True, max_retries=5)
+def send_email(subject, html_body, to):
+
+    email = EmailMultiAlternatives(
+        subject=subject,
+        from_email=settings.EMAIL_FROM_USER,
+        to=to,
+    )
+    email.attach_alternative(html_body, "text/html")
+    email.send()
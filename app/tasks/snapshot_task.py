@@ -0,0 +1,13 @@
+from config import celery_app
+from app.services.snapshot_service import write_snapshots
+from app.utils.locks import singleton_task
+
+
+# Keeps the daily Parquet partitions of the news corpus in sync with the links table,
+# only the days which changed since the last run are rewritten
+
+@celery_app.task()
+@singleton_task(timeout=60 * 60)
+def snapshot_news_task():
+
+    write_snapshots()
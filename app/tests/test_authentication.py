@@ -7,6 +7,7 @@ from rest_framework import status
 from rest_framework.test import APITestCase, APIClient
 
 from app.models.user import User
+from config import celery_app
 
 
 class AuthenticationTest(APITestCase):
@@ -22,6 +23,10 @@ class AuthenticationTest(APITestCase):
     }
 
     def setUp(self):
+        # Emails are sent by a celery task, run it in process
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+
         self.mail = mail
         self.login_url = reverse("login")
         self.logout_url = reverse("auth_logout")
@@ -0,0 +1,28 @@
+import json
+from io import StringIO
+
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from app.models.link import Link
+from app.services.dedup_service import assign_cluster
+
+
+class BenchmarkPipelineTest(TestCase):
+    def test_every_stage_is_measured_offline(self):
+        out = StringIO()
+        with mock.patch("app.management.commands.benchmark_pipeline.assign_cluster", wraps=assign_cluster) as dedup:
+            call_command("benchmark_pipeline", iterations=2, batch_size=20, seed_rows=50, json=True, stdout=out)
+
+        rows = {row["stage"]: row for row in json.loads(out.getvalue())}
+
+        self.assertEqual(set(rows), {"fetch_http", "fetch_selenium", "links", "article", "dedup", "persist"})
+        self.assertEqual(rows["fetch_http"]["items"], 12)
+        self.assertEqual(rows["persist"]["items"], 20)
+        self.assertTrue(all(row["per_second"] > 0 for row in rows.values()))
+        # the dedup stage queries seeded news and finds the corpus articles among them
+        self.assertTrue(all(link.canonical_id for (link, _), _ in dedup.call_args_list))
+        # the database stages are rolled back
+        self.assertFalse(Link.objects.exists())
@@ -0,0 +1,71 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from app.utils.crawler import crawl
+from app.utils.rate_limiter import RateLimited
+
+
+class CrawlerTest(SimpleTestCase):
+    def test_sites_are_fetched_concurrently(self):
+        def fetch(url):
+            time.sleep(0.3)
+            return url
+
+        started = time.monotonic()
+        urls = ["https://a.com", "https://b.com", "https://c.com"]
+        pages = crawl(urls, fetch=fetch, timeout=5)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(pages, {url: url for url in urls})
+        self.assertLess(elapsed, 0.8)
+
+    def test_slow_and_failing_sites_return_partial_results(self):
+        release = threading.Event()
+
+        def fetch(url):
+            if "slow" in url:
+                release.wait(5)
+            if "broken" in url:
+                raise ConnectionError(url)
+            return "ok"
+
+        try:
+            pages = crawl(["https://slow.com", "https://broken.com", "https://fast.com"], fetch=fetch, timeout=0.3)
+        finally:
+            release.set()
+
+        self.assertEqual(pages, {"https://slow.com": None, "https://broken.com": None, "https://fast.com": "ok"})
+
+    def test_per_host_limit(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def fetch(url):
+            with lock:
+                running.append(url)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(url)
+            return url
+
+        crawl([f"https://a.com/{i}" for i in range(6)], fetch=fetch, per_host_limit=2, timeout=5)
+
+        self.assertEqual(max(peak), 2)
+
+    def test_rate_limited_site_is_retried(self):
+        calls = []
+
+        def fetch(url):
+            calls.append(url)
+            if len(calls) == 1:
+                raise RateLimited("a.com", 0.05)
+            return "ok"
+
+        pages = crawl(["https://a.com"], fetch=fetch, timeout=5)
+
+        self.assertEqual(pages, {"https://a.com": "ok"})
+        self.assertEqual(len(calls), 2)
@@ -0,0 +1,111 @@
+import datetime as dt
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app.extractors.base import SiteExtractor
+from app.models.link import Link
+from app.services import article_service
+from app.services.article_service import scrape_link
+from app.utils.devanagari import tokenize
+from app.utils.scrapers import PageStream
+from app.utils.simhash import bands, hamming_distance, simhash, to_signed, to_unsigned
+
+STORY = (
+    "काठमाडौं उपत्यकामा बिहीबार बिहानदेखि भारी वर्षा भइरहेको छ। मौसम पूर्वानुमान महाशाखाका अनुसार "
+    "मनसुन सक्रिय भएकाले आगामी तीन दिनसम्म देशभर मध्यमदेखि भारी वर्षा हुने सम्भावना छ। "
+    "बाढी र पहिरोको जोखिम भएका क्षेत्रमा बस्नेहरूलाई सतर्क रहन आग्रह गरिएको छ। "
+    "बागमती नदीको सतह बढेकाले तटीय क्षेत्रमा बस्ने नागरिकलाई सुरक्षित स्थानमा सर्न प्रशासनले सूचना जारी गरेको छ। "
+    "विद्यालयहरू दुई दिन बन्द गर्ने निर्णय गरिएको छ। जिल्ला प्रशासन कार्यालयले नेपाली सेना, सशस्त्र प्रहरी र "
+    "नेपाल प्रहरीलाई उद्धारका लागि तयारी अवस्थामा राखेको जनाएको छ। पूर्वी नेपालका कोशी र कन्काई नदीमा पनि पानीको "
+    "बहाव बढेको जल तथा मौसम विज्ञान विभागले जनाएको छ। त्रिभुवन अन्तर्राष्ट्रिय विमानस्थलबाट उड्ने केही आन्तरिक "
+    "उडान मौसम खराब भएका कारण स्थगित गरिएका छन्। काठमाडौं महानगरपालिकाले जलमग्न सडकबाट पानी निकास गर्न "
+    "दमकल र कर्मचारी परिचालन गरेको छ। बीपी राजमार्ग र पृथ्वी राजमार्गका केही खण्डमा पहिरो खसेर यातायात "
+    "अवरुद्ध भएको छ। ट्राफिक प्रहरीले यात्रुलाई अनावश्यक यात्रा नगर्न सुझाव दिएको छ। कृषि मन्त्रालयले धान "
+    "रोपाइँका लागि यो वर्षा उपयोगी भए पनि तराईका खेतमा डुबान हुन सक्ने चेतावनी दिएको छ। स्वास्थ्य मन्त्रालयले "
+    "पानीजन्य रोगबाट बच्न उमालेको पानी पिउन सबैलाई अनुरोध गरेको छ। गृह मन्त्रालयको राष्ट्रिय आपत्कालीन कार्यसञ्चालन "
+    "केन्द्रले चौबीसै घण्टा अनुगमन गरिरहेको जनाएको छ।"
+)
+EDITED_STORY = STORY.replace("बिहीबार बिहानदेखि", "बिहीबार बिहानैदेखि")
+OTHER_STORY = (
+    "सरकारले आगामी आर्थिक वर्षका लागि सत्र खर्ब रुपैयाँको बजेट संसदमा प्रस्तुत गरेको छ। "
+    "अर्थमन्त्रीले पूर्वाधार, शिक्षा र स्वास्थ्य क्षेत्रमा लगानी बढाउने घोषणा गर्नुभयो।"
+)
+
+
+class SimhashTest(SimpleTestCase):
+    def test_small_edits_keep_hashes_close(self):
+        original = simhash(tokenize(STORY))
+
+        self.assertLessEqual(hamming_distance(original, simhash(tokenize(EDITED_STORY))), 3)
+        self.assertGreater(hamming_distance(original, simhash(tokenize(OTHER_STORY))), 10)
+
+    def test_signed_round_trip_and_bands(self):
+        value = (1 << 64) - 1
+        self.assertEqual(to_unsigned(to_signed(value)), value)
+        self.assertEqual(bands(0x0004_0003_0002_0001), [1, 2, 3, 4])
+
+
+def article_page(title, body):
+    return PageStream(
+        [f"<html><head><title>{title}</title></head><body><article><p>{body}</p></article></body></html>"], "http"
+    )
+
+
+@override_settings(
+    SCRAPER_STORE_RAW_HTML=False,
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+)
+class NearDuplicateTest(TestCase):
+    def scrape(self, source, title, body):
+        link = Link.objects.create(url=f"https://{source}/{title}", url_hash=f"{source}{title}"[:64], source=source)
+        with mock.patch.object(article_service, "fetch_stream", return_value=article_page(title, body)):
+            scrape_link(link, SiteExtractor)
+        link.refresh_from_db()
+        return link
+
+    def test_republished_story_joins_the_first_copy(self):
+        first = self.scrape("onlinekhabar.com", "वर्षा", STORY)
+        copy = self.scrape("ekantipur.com", "भारी वर्षा", EDITED_STORY)
+        other = self.scrape("ekantipur.com", "बजेट", OTHER_STORY)
+
+        self.assertIsNone(first.canonical_id)
+        self.assertEqual(copy.canonical_id, first.id)
+        self.assertIsNone(other.canonical_id)
+
+        # Re-scraping the canonical news keeps it canonical
+        with mock.patch.object(article_service, "fetch_stream", return_value=article_page("वर्षा", STORY)):
+            scrape_link(first, SiteExtractor)
+        first.refresh_from_db()
+        self.assertIsNone(first.canonical_id)
+
+    def test_cluster_leader_stays_canonical(self):
+        first = self.scrape("onlinekhabar.com", "वर्षा", STORY)
+        copy = self.scrape("ekantipur.com", "भारी वर्षा", EDITED_STORY)
+        other = self.scrape("ekantipur.com", "बजेट", OTHER_STORY)
+
+        # The leader now reads like another story, it must not become a duplicate of it
+        with mock.patch.object(article_service, "fetch_stream", return_value=article_page("बजेट", OTHER_STORY)):
+            scrape_link(first, SiteExtractor)
+        first.refresh_from_db()
+        copy.refresh_from_db()
+
+        self.assertIsNone(first.canonical_id)
+        self.assertEqual(copy.canonical_id, first.id)
+        self.assertIsNone(other.canonical_id)
+
+    def test_api_exposes_clusters(self):
+        published_at = timezone.make_aware(dt.datetime(2023, 6, 20, 10, 0))
+        first = self.scrape("onlinekhabar.com", "वर्षा", STORY)
+        copy = self.scrape("ekantipur.com", "भारी वर्षा", EDITED_STORY)
+        Link.objects.update(published_at=published_at)
+
+        response = self.client.get(
+            reverse("news_list"), {"date_from": "2023-06-20", "date_to": "2023-06-20", "canonical_only": "true"}
+        )
+        self.assertEqual([row["id"] for row in response.data["data"]], [first.id])
+
+        response = self.client.get(reverse("news_detail", kwargs={"news_id": copy.id}))
+        self.assertEqual([row["id"] for row in response.data["data"]["duplicates"]], [first.id])
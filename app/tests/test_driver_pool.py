@@ -0,0 +1,86 @@
+from django.test import SimpleTestCase
+from selenium.common.exceptions import WebDriverException
+
+from app.utils.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.alive = True
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise WebDriverException("session deleted")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+class DriverPoolTest(SimpleTestCase):
+    def setUp(self):
+        self.created = []
+
+        def factory():
+            driver = FakeDriver()
+            self.created.append(driver)
+            return driver
+
+        self.pool = DriverPool(size=2, max_pages=3, factory=factory, acquire_timeout=0.1)
+
+    def test_session_is_reused(self):
+        with self.pool.session() as first:
+            pass
+        with self.pool.session() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertEqual(len(self.created), 1)
+
+    def test_pool_is_bounded(self):
+        with self.pool.session(), self.pool.session():
+            with self.assertRaises(TimeoutError):
+                with self.pool.session():
+                    pass
+
+    def test_session_recycled_after_max_pages(self):
+        for _ in range(3):
+            with self.pool.session():
+                pass
+
+        self.assertTrue(self.created[0].quit_called)
+
+        with self.pool.session() as driver:
+            pass
+
+        self.assertIs(driver, self.created[1])
+
+    def test_broken_session_is_discarded(self):
+        with self.assertRaises(WebDriverException):
+            with self.pool.session():
+                raise WebDriverException("crash")
+
+        self.assertTrue(self.created[0].quit_called)
+
+    def test_unhealthy_idle_session_is_replaced(self):
+        with self.pool.session() as driver:
+            pass
+        driver.alive = False
+
+        with self.pool.session() as replacement:
+            pass
+
+        self.assertIsNot(driver, replacement)
+        self.assertTrue(driver.quit_called)
+
+    def test_close_quits_idle_sessions(self):
+        with self.pool.session():
+            pass
+
+        self.pool.close()
+
+        self.assertTrue(self.created[0].quit_called)
+        with self.assertRaises(RuntimeError):
+            with self.pool.session():
+                pass
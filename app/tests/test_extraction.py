@@ -0,0 +1,259 @@
+import datetime as dt
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from app.extractors import get_extractor
+from app.extractors.base import SiteExtractor
+from app.extractors.onlinekhabar import OnlinekhabarExtractor
+from app.extractors.selectors import Selector
+from app.models.link import Link
+from app.services import article_service
+from app.services.article_service import scrape_link, scrape_links
+from app.utils.extraction import parse_article
+from app.utils.html_archive import FileSystemArchive, get_html_archive
+from app.utils.rate_limiter import RateLimited
+from app.utils.scrapers import PageStream
+
+ARTICLE_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <title>Onlinekhabar</title>
+    <meta property="og:title" content="काठमाडौंमा भारी वर्षा">
+    <meta property="article:published_time" content="2023-06-20T10:15:00+05:45">
+    <script>var ads = "<p>not a paragraph</p>";</script>
+</head>
+<body>
+    <nav><a href="/">Home</a><a href="https://facebook.com/onlinekhabar">Facebook</a></nav>
+    <article>
+        <h1>काठमाडौंमा भारी वर्षा</h1>
+        <p>काठमाडौं उपत्यकामा   बिहीबार बिहानदेखि भारी वर्षा भइरहेको छ।</p>
+        <p>मौसम पूर्वानुमान महाशाखाले <a href="/2023/06/1235">थप वर्षा</a> हुने जनाएको छ।</p>
+    </article>
+    <footer><p>© Onlinekhabar</p></footer>
+</body>
+</html>
+"""
+
+
+def chunked(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+
+def page(text, method="http"):
+    """What fetch_stream returns for `text`."""
+    return PageStream(chunked(text, 512), method)
+
+
+class ParseArticleTest(SimpleTestCase):
+    def test_article_fields_are_extracted_from_chunks(self):
+        # Small chunks split tags and multi byte words across feeds
+        article = parse_article(chunked(ARTICLE_PAGE, 7), "https://www.onlinekhabar.com/2023/06/1234")
+
+        self.assertEqual(article.title, "काठमाडौंमा भारी वर्षा")
+        self.assertEqual(article.published_raw, "2023-06-20T10:15:00+05:45")
+        self.assertEqual(article.published_at.isoformat(), "2023-06-20T10:15:00+05:45")
+        self.assertEqual(
+            article.body,
+            "काठमाडौं उपत्यकामा बिहीबार बिहानदेखि भारी वर्षा भइरहेको छ।\n\n"
+            "मौसम पूर्वानुमान महाशाखाले थप वर्षा हुने जनाएको छ।",
+        )
+        self.assertEqual(
+            article.links,
+            ["https://www.onlinekhabar.com/", "https://www.onlinekhabar.com/2023/06/1235"],
+        )
+
+
+ONLINEKHABAR_PAGE = """<html><body>
+<div class="ok-post-header"><h1>बजेट <b>सार्वजनिक</b></h1></div>
+<div class="ok-news-post-hour"><span>जेठ १५, २०८०</span></div>
+<div class="ok18-single-post-content-wrap">
+    <p>अर्थमन्त्रीले बजेट सार्वजनिक गर्नुभयो।<br>विवरण यस्तो छ।</p>
+    <ul><li>पहिलो<li>दोस्रो</ul>
+    <p>संसदमा छलफल हुनेछ।</p>
+</div>
+<div class="related"><p>सम्बन्धित खबर</p></div>
+</body></html>"""
+
+
+class SiteExtractorTest(SimpleTestCase):
+    def test_selectors(self):
+        stack = [("div", {"class": "wrap main"}, frozenset({"wrap", "main"})), ("span", {"id": "date"}, frozenset())]
+
+        self.assertTrue(Selector("div.wrap span#date").matches(stack))
+        self.assertTrue(Selector("span").matches(stack))
+        self.assertFalse(Selector("div.other span").matches(stack))
+        self.assertFalse(Selector("div").matches(stack))
+        self.assertTrue(Selector("[class] [id=date]").matches(stack))
+
+    def test_site_rules_select_article_parts(self):
+        article = parse_article(
+            chunked(ONLINEKHABAR_PAGE, 10), "https://www.onlinekhabar.com", rules=OnlinekhabarExtractor.rules()
+        )
+
+        self.assertEqual(article.title, "बजेट सार्वजनिक")
+        self.assertEqual(article.published_raw, "जेठ १५, २०८०")
+        self.assertEqual(article.published_at.date(), dt.date(2023, 5, 29))
+        self.assertEqual(article.body, "अर्थमन्त्रीले बजेट सार्वजनिक गर्नुभयो। विवरण यस्तो छ।\n\nसंसदमा छलफल हुनेछ।")
+
+    def test_rules_are_compiled_once_per_extractor(self):
+        self.assertIs(OnlinekhabarExtractor.rules(), OnlinekhabarExtractor.rules())
+        self.assertIsNot(OnlinekhabarExtractor.rules(), SiteExtractor.rules())
+
+    def test_rules_are_compiled_again_when_they_change(self):
+        rules = OnlinekhabarExtractor.rules()
+
+        with mock.patch.object(OnlinekhabarExtractor, "title_selector", "h1.title"):
+            changed = OnlinekhabarExtractor.rules()
+            self.assertIsNot(changed, rules)
+            self.assertIs(OnlinekhabarExtractor.rules(), changed)
+
+        with mock.patch.object(OnlinekhabarExtractor, "version", OnlinekhabarExtractor.version + 1):
+            self.assertIsNot(OnlinekhabarExtractor.rules(), rules)
+
+    def test_published_date_patterns(self):
+        pattern = r"(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2}) (?P<hour>\d{1,2}):(?P<minute>\d{2})"
+        with mock.patch.multiple(OnlinekhabarExtractor, date_patterns=(pattern,), date_converter="gregorian"):
+            rules = OnlinekhabarExtractor.rules()
+
+            published_at = rules.parse_published("प्रकाशित: २०२३-०६-०१ १०:३०")
+            self.assertEqual(
+                (published_at.year, published_at.month, published_at.day, published_at.hour, published_at.minute),
+                (2023, 6, 1, 10, 30),
+            )
+            # Dates the patterns do not match are read as ISO 8601
+            self.assertEqual(rules.parse_published("2023-06-01T10:30:00+05:45").minute, 30)
+            self.assertIsNone(rules.parse_published(""))
+
+    def test_registry_is_keyed_by_domain(self):
+        self.assertIs(get_extractor("onlinekhabar.com"), OnlinekhabarExtractor)
+        self.assertIsNone(get_extractor("example.com"))
+
+    def test_article_urls(self):
+        self.assertTrue(OnlinekhabarExtractor.is_article_url("https://www.onlinekhabar.com/2023/06/1234"))
+        self.assertFalse(OnlinekhabarExtractor.is_article_url("https://www.onlinekhabar.com/content/news"))
+
+
+class HtmlArchiveTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.archive = FileSystemArchive(tmp.name)
+
+    def archive_page(self, page):
+        writer = self.archive.writer()
+        parse_article(chunked(page, 100), "https://www.onlinekhabar.com", writer)
+        return writer.commit()
+
+    def test_raw_html_round_trips(self):
+        content_hash = self.archive_page(ARTICLE_PAGE)
+
+        self.assertTrue(self.archive.path(content_hash).name.endswith(".html.gz"))
+        self.assertEqual(self.archive.read(content_hash), ARTICLE_PAGE)
+
+    def test_identical_pages_are_stored_once(self):
+        first = self.archive_page(ARTICLE_PAGE)
+        second = self.archive_page(ARTICLE_PAGE)
+        other = self.archive_page(ARTICLE_PAGE.replace("भारी", "हल्का"))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        blobs = list(self.archive.root.rglob("*.html.gz"))
+        self.assertEqual(len(blobs), 2)
+        self.assertEqual(list(self.archive.tmp_dir.iterdir()), [])
+
+
+class ScrapeLinkTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+
+        overridden = self.settings(
+            HTML_ARCHIVE_OPTIONS={"root": tmp.name},
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        )
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+
+        self.link = Link.objects.create(
+            url="https://www.onlinekhabar.com/2023/06/1234",
+            url_hash="a" * 64,
+            source="onlinekhabar.com",
+        )
+
+    @override_settings(SCRAPER_STORE_RAW_HTML=False)
+    def test_article_is_saved_without_raw_html(self):
+        with mock.patch.object(article_service, "fetch_stream", return_value=page(ARTICLE_PAGE)):
+            scrape_link(self.link, SiteExtractor)
+
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.status, Link.Status.SCRAPED)
+        self.assertEqual(self.link.title, "काठमाडौंमा भारी वर्षा")
+        self.assertEqual(self.link.page_source_hash, "")
+
+    @override_settings(SCRAPER_STORE_RAW_HTML=True)
+    def test_page_without_body_falls_back_to_selenium(self):
+        pages = [page("<html><body><div id='root'></div></body></html>"), page(ARTICLE_PAGE, "selenium")]
+        with mock.patch.object(article_service, "fetch_stream", side_effect=pages) as fetch_stream:
+            scrape_link(self.link, SiteExtractor)
+
+        self.assertEqual(fetch_stream.call_args.kwargs, {"force_selenium": True})
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.status, Link.Status.SCRAPED)
+        self.assertEqual(get_html_archive().read(self.link.page_source_hash), ARTICLE_PAGE)
+
+    def test_page_without_article_is_invalid(self):
+        empty = "<html><body></body></html>"
+        with mock.patch.object(article_service, "fetch_stream", side_effect=[page(empty), page(empty, "selenium")]):
+            scrape_link(self.link, SiteExtractor)
+
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.status, Link.Status.INVALID)
+
+    @override_settings(SCRAPER_STORE_RAW_HTML=False)
+    def test_batch_is_saved_in_bulk_and_rate_limited_links_deferred(self):
+        empty = Link.objects.create(url="https://www.onlinekhabar.com/2023/06/1235", url_hash="b" * 64,
+                                    source="onlinekhabar.com")
+        limited = [
+            Link.objects.create(url=f"https://ekantipur.com/news/{i}", url_hash=f"{i}" * 64, source="ekantipur.com")
+            for i in range(2)
+        ]
+
+        def fetch_stream(url, force_selenium=False):
+            if "ekantipur" in url:
+                raise RateLimited("ekantipur.com", 7)
+            if url == empty.url:
+                return page("<html><body></body></html>", "selenium" if force_selenium else "http")
+            return page(ARTICLE_PAGE)
+
+        links = list(Link.objects.order_by("id"))
+        with mock.patch.object(article_service, "fetch_stream", side_effect=fetch_stream) as fetch, \
+                mock.patch.object(article_service, "get_extractor", return_value=SiteExtractor):
+            deferred, retry_after = scrape_links(links)
+
+        self.assertEqual(deferred, [link.id for link in limited])
+        self.assertEqual(retry_after, 7)
+        # the second ekantipur link is deferred without fetching
+        self.assertEqual(fetch.call_count, 4)
+
+        statuses = dict(Link.objects.values_list("id", "status"))
+        self.assertEqual(statuses[self.link.id], Link.Status.SCRAPED)
+        self.assertEqual(statuses[empty.id], Link.Status.INVALID)
+        self.assertEqual(statuses[limited[0].id], Link.Status.PENDING)
+
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.scrape_attempts, 1)
+        self.assertIsNotNone(self.link.scraped_at)
+
+    def test_failed_scrape_is_recorded_on_link(self):
+        with mock.patch.object(article_service, "fetch_stream", side_effect=ConnectionError("reset")), \
+                mock.patch.object(article_service, "get_extractor", return_value=SiteExtractor):
+            deferred, _ = scrape_links([self.link])
+
+        self.assertEqual(deferred, [])
+        self.link.refresh_from_db()
+        self.assertEqual(self.link.status, Link.Status.FAILED)
+        self.assertEqual(self.link.scrape_attempts, 1)
+        self.assertIn("reset", self.link.last_error)
+        self.assertIsNone(self.link.scraped_at)
@@ -0,0 +1,257 @@
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from app.models.link import Link
+from app.models.watched_page import WatchedPage
+from app.services import link_service
+from app.services.link_service import save_links
+from app.services.watch_service import due_pages, get_watched_pages, record_check, save_check
+from app.tasks.aggrigate_links_task import aggrigate_links_task
+from app.utils.extraction import extract_links
+from app.utils.scrapers import FetchResult
+from app.utils import seen_filter
+from app.utils.seen_filter import BloomFilter, SeenUrlIndex
+from app.utils.urls import normalize_url, url_hash
+
+
+class NormalizeUrlTest(SimpleTestCase):
+    def test_equivalent_urls_share_a_hash(self):
+        urls = [
+            "https://www.onlinekhabar.com/2023/06/1234",
+            "HTTPS://WWW.ONLINEKHABAR.COM:443/2023/06/1234/",
+            "https://www.onlinekhabar.com/2023/06/1234?utm_source=facebook#comments",
+        ]
+        self.assertEqual(len({url_hash(url) for url in urls}), 1)
+
+    def test_query_parameters_are_sorted(self):
+        self.assertEqual(
+            normalize_url("https://ekantipur.com/search?q=news&page=2"),
+            "https://ekantipur.com/search?page=2&q=news",
+        )
+
+
+class ExtractLinksTest(SimpleTestCase):
+    def test_only_same_site_links_are_kept(self):
+        page_source = """
+            <a href="/news/2023/06/10/1">One</a>
+            <a href="https://www.onlinekhabar.com/news/2023/06/10/1/">Duplicate</a>
+            <a href="https://facebook.com/onlinekhabar">External</a>
+            <a href="mailto:info@onlinekhabar.com">Mail</a>
+            <a>No href</a>
+        """
+        links = extract_links(page_source, "https://www.onlinekhabar.com")
+        self.assertEqual(links, ["https://www.onlinekhabar.com/news/2023/06/10/1"])
+
+
+class SaveLinksTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(link_service, "get_seen_index", return_value=SeenUrlIndex())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rediscovered_links_are_not_duplicated(self):
+        urls = ["https://ekantipur.com/news/1", "https://ekantipur.com/news/2"]
+
+        first = save_links("ekantipur.com", urls)
+        second = save_links("ekantipur.com", urls + ["https://ekantipur.com/news/3"])
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(second, list(Link.objects.filter(url="https://ekantipur.com/news/3").values_list("id", flat=True)))
+        self.assertEqual(Link.objects.filter(source="ekantipur.com").count(), 3)
+
+    def test_links_of_a_failed_insert_are_not_seen(self):
+        urls = ["https://ekantipur.com/news/1"]
+
+        with mock.patch.object(Link.objects, "bulk_create", side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                save_links("ekantipur.com", urls)
+
+        self.assertEqual(len(save_links("ekantipur.com", urls)), 1)
+
+    def test_seen_links_do_not_query_database(self):
+        urls = ["https://ekantipur.com/news/1"]
+        save_links("ekantipur.com", urls)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(save_links("ekantipur.com", urls), [])
+
+
+class FakeRedis:
+    """The redis commands of the seen url index, on python sets."""
+
+    def __init__(self):
+        self.sets = {}
+        self.values = {}
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self.commands = []
+
+            def sadd(self, name, value):
+                self.commands.append((redis.sadd, name, value))
+
+            def sismember(self, name, value):
+                self.commands.append((redis.sismember, name, value))
+
+            def execute(self):
+                results = [command(name, value) for command, name, value in self.commands]
+                self.commands = []
+                return results
+
+        return Pipeline()
+
+    def sadd(self, name, value):
+        members = self.sets.setdefault(name, set())
+        added = value not in members
+        members.add(value)
+        return int(added)
+
+    def sismember(self, name, value):
+        return int(value in self.sets.get(name, ()))
+
+    def exists(self, *names):
+        return sum(name in self.sets or name in self.values for name in names)
+
+    def set(self, name, value, nx=False, ex=None):
+        if nx and name in self.values:
+            return None
+        self.values[name] = value
+        return True
+
+    def delete(self, name):
+        self.values.pop(name, None)
+        self.sets.pop(name, None)
+
+
+class SeenUrlIndexTest(SimpleTestCase):
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.001)
+        keys = [url_hash(f"https://ekantipur.com/news/{i}") for i in range(1000)]
+        for key in keys:
+            bloom.add(key)
+
+        self.assertTrue(all(key in bloom for key in keys))
+        misses = [url_hash(f"https://onlinekhabar.com/news/{i}") for i in range(1000)]
+        self.assertLess(sum(key in bloom for key in misses), 10)
+
+    def test_shared_index_lets_one_worker_queue_each_key(self):
+        redis = FakeRedis()
+        worker_one = SeenUrlIndex(redis=redis)
+        worker_two = SeenUrlIndex(redis=redis)
+        key = url_hash("https://ekantipur.com/news/1")
+
+        # Both workers found the link before either stored it
+        self.assertEqual(worker_one.unseen([key]), [key])
+        self.assertEqual(worker_two.unseen([key]), [key])
+        self.assertEqual(worker_one.mark_seen([key]), [key])
+        self.assertEqual(worker_two.mark_seen([key]), [])
+        self.assertEqual(worker_two.unseen([key]), [])
+
+    def test_full_bloom_filter_starts_again(self):
+        index = SeenUrlIndex(redis=FakeRedis(), capacity=2)
+        keys = [url_hash(f"https://ekantipur.com/news/{i}") for i in range(3)]
+
+        index.mark_seen(keys[:2])
+        index.mark_seen(keys[2:])
+
+        self.assertEqual(index.bloom_count, 1)
+        self.assertNotIn(keys[0], index.bloom)
+        self.assertEqual(index.unseen(keys), [])
+
+    def test_index_is_rebuilt_when_a_shard_is_missing(self):
+        redis = FakeRedis()
+        index = SeenUrlIndex(redis=redis, shards=4)
+        keys = [url_hash(f"https://ekantipur.com/news/{i}") for i in range(3)]
+        rebuild = mock.patch.object(seen_filter.Link.objects, "values_list")
+
+        with mock.patch.object(seen_filter, "get_seen_index", return_value=index), rebuild as values_list, \
+                self.assertLogs(seen_filter.logger, "INFO"):
+            values_list.return_value.iterator.return_value = keys
+            seen_filter.rebuild_seen_index()
+            self.assertEqual(index.unseen(keys), [])
+
+            # Rebuilt already and nothing is missing
+            seen_filter.rebuild_seen_index()
+            self.assertEqual(values_list.call_count, 1)
+
+            # Evicted by redis
+            redis.sets.pop("seen_urls:0")
+            seen_filter.rebuild_seen_index()
+            self.assertEqual(values_list.call_count, 2)
+            self.assertIn("-", redis.sets["seen_urls:0"])
+
+
+class ChangeDetectionTest(TestCase):
+    url = "https://ekantipur.com"
+
+    def test_same_link_set_is_not_a_change(self):
+        page = get_watched_pages([self.url])[self.url]
+
+        self.assertTrue(record_check(page, FetchResult("<html/>", etag='"v1"'), ["a", "b"]))
+        self.assertFalse(record_check(page, FetchResult("<html/>", etag='"v2"'), ["b", "a"]))
+        self.assertTrue(record_check(page, FetchResult("<html/>", etag='"v3"'), ["a", "b", "c"]))
+        save_check(page)
+
+        page.refresh_from_db()
+        self.assertEqual(page.etag, '"v3"')
+
+    def test_not_modified_keeps_validators(self):
+        page = get_watched_pages([self.url])[self.url]
+        record_check(page, FetchResult("<html/>", etag='"v1"'), ["a"])
+
+        self.assertFalse(record_check(page, FetchResult(etag='"v1"', not_modified=True)))
+        save_check(page)
+
+        page.refresh_from_db()
+        self.assertEqual(page.etag, '"v1"')
+        self.assertIsNotNone(page.checked_at)
+
+    @override_settings(WATCH_MIN_INTERVAL=30, WATCH_MAX_INTERVAL=600)
+    def test_interval_follows_publish_rate(self):
+        page = get_watched_pages([self.url])[self.url]
+        record_check(page, FetchResult("<html/>"), ["a"])
+        self.assertEqual(page.interval, 30)
+
+        for _ in range(10):
+            record_check(page, FetchResult(not_modified=True))
+        self.assertEqual(page.interval, 600)
+
+        record_check(page, FetchResult("<html/>"), ["a", "b"])
+        self.assertEqual(page.interval, 300)
+
+    def test_only_due_pages_are_crawled(self):
+        pages = get_watched_pages([self.url, "https://www.onlinekhabar.com"])
+        record_check(pages[self.url], FetchResult("<html/>"), ["a"])
+
+        self.assertEqual(list(due_pages(pages)), ["https://www.onlinekhabar.com"])
+
+    def test_page_is_saved_only_after_its_links_are_queued(self):
+        result = FetchResult('<a href="https://ekantipur.com/news/2023/06/10/1">One</a>', etag='"v1"')
+
+        with mock.patch("app.tasks.aggrigate_links_task.urls", [self.url]), \
+                mock.patch("app.tasks.aggrigate_links_task.crawl", return_value={self.url: result}), \
+                mock.patch("app.tasks.aggrigate_links_task.save_links", side_effect=DatabaseError):
+            # The undecorated task, without the redis lock of singleton_task
+            with self.assertRaises(DatabaseError):
+                aggrigate_links_task.run.__wrapped__()
+
+        # The next poll fetches the page without validators and sees its links as new
+        page = WatchedPage.objects.get(url=self.url)
+        self.assertEqual((page.etag, page.fingerprint), ("", ""))
+        self.assertIsNone(page.next_check_at)
+
+    def test_page_without_extractor_is_backed_off(self):
+        url = "https://example.com"
+
+        with mock.patch("app.tasks.aggrigate_links_task.urls", [url]), \
+                mock.patch("app.tasks.aggrigate_links_task.crawl", return_value={url: FetchResult("<html/>")}):
+            aggrigate_links_task.run.__wrapped__()
+
+        page = WatchedPage.objects.get(url=url)
+        self.assertIsNotNone(page.next_check_at)
+        self.assertEqual(due_pages({url: page}), {})
@@ -0,0 +1,89 @@
+import datetime as dt
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from redis.exceptions import DataError
+
+from app.tasks.aggrigate_links_task import aggrigate_links_task
+from app.tasks.rescrape_failed_task import rescrape_failed_task
+from app.utils import locks
+from app.utils.locks import RedisLock, singleton_task
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, nx=False, ex=None):
+        # Same check as redis-py, which refuses a float expiry
+        if ex is not None and not isinstance(ex, (int, dt.timedelta)):
+            raise DataError("ex must be datetime.timedelta or int")
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, token):
+        if self.values.get(key) == token:
+            del self.values[key]
+            return 1
+        return 0
+
+
+class FakeRedisMixin:
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = mock.patch.object(locks, "get_redis", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class SingletonTaskTest(FakeRedisMixin, SimpleTestCase):
+
+    def test_overlapping_run_is_skipped(self):
+        runs = []
+
+        @singleton_task(timeout=60)
+        def crawl():
+            runs.append("outer")
+            self.assertIsNone(crawl())
+            return "done"
+
+        self.assertEqual(crawl(), "done")
+        self.assertEqual(runs, ["outer"])
+        # released after the run, the next tick runs again
+        self.assertEqual(crawl(), "done")
+
+    def test_lock_taken_over_after_expiry_is_not_released(self):
+        first = RedisLock("crawl", timeout=60)
+        self.assertTrue(first.acquire())
+
+        # the lock expired and another worker took it
+        self.redis.values[first.key] = "other"
+
+        self.assertFalse(first.release())
+        self.assertEqual(self.redis.values[first.key], "other")
+
+    def test_float_timeout_is_rounded_up(self):
+        lock = RedisLock("crawl", timeout=45.5)
+
+        self.assertEqual(lock.timeout, 46)
+        self.assertTrue(lock.acquire())
+
+
+class ScheduledTaskLockTest(FakeRedisMixin, TestCase):
+    @override_settings(CRAWLER_TIMEOUT=45.0)
+    def test_beat_tasks_run_behind_their_lock(self):
+        # The decorated tasks as beat runs them, nothing is due and nothing failed
+        with mock.patch("app.tasks.aggrigate_links_task.urls", []):
+            aggrigate_links_task()
+        rescrape_failed_task()
+
+        self.assertEqual(self.redis.values, {})
+
+    def test_rescrape_run_is_skipped_while_locked(self):
+        self.redis.values["lock:app.tasks.rescrape_failed_task.rescrape_failed_task"] = "other"
+
+        with mock.patch("app.tasks.rescrape_failed_task.Link.objects") as objects:
+            self.assertIsNone(rescrape_failed_task())
+        objects.filter.assert_not_called()
@@ -0,0 +1,75 @@
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from app.extractors.base import SiteExtractor
+from app.services import article_service
+from app.utils import metrics
+from app.utils.scrapers import PageStream
+
+
+def sample(name, **labels):
+    return metrics.collect().get_sample_value(name, labels) or 0
+
+
+class MetricsTest(SimpleTestCase):
+    def setUp(self):
+        # Metric files outlive a test run, every test counts under labels of its own
+        self.label = uuid.uuid4().hex
+
+    def test_label_values_are_escaped(self):
+        metrics.RATE_LIMITED.labels(domain=f'{self.label}"\\').inc()
+
+        self.assertIn(f'scraper_rate_limited_total{{domain="{self.label}\\"\\\\"}} 1.0', metrics.render().decode())
+
+    def test_task_signals_record_timing_and_queue_lag(self):
+        headers = {}
+        metrics.stamp_published_at(headers=headers)
+        headers["published_at"] -= 2
+
+        task = SimpleNamespace(
+            name=self.label,
+            request=SimpleNamespace(published_at=headers["published_at"], delivery_info={"routing_key": "scrape"}),
+        )
+        metrics.task_started(task_id="1", task=task)
+        metrics.task_finished(task_id="1", task=task, state="SUCCESS")
+
+        self.assertEqual(sample("celery_task_seconds_count", task=self.label, state="SUCCESS"), 1)
+        self.assertGreaterEqual(sample("celery_queue_lag_seconds_sum", task=self.label, queue="scrape"), 2)
+
+    @override_settings(SCRAPER_STORE_RAW_HTML=False)
+    def test_article_extract_is_labelled_with_the_fetch_method(self):
+        page = PageStream(["<html><body><article><p>खबर</p></article></body></html>"], "selenium")
+        url = f"https://{self.label}.com/news/1"
+
+        with mock.patch.object(article_service, "fetch_stream", return_value=page):
+            article_service._extract(url, SiteExtractor.rules())
+
+        self.assertEqual(sample("article_extract_seconds_count", domain=f"{self.label}.com", method="selenium"), 1)
+        self.assertEqual(sample("article_extract_seconds_count", domain=f"{self.label}.com", method="http"), 0)
+
+
+class MetricsApiTest(APITestCase):
+    @override_settings(METRICS_ALLOWED_IPS=["127.0.0.1"])
+    def test_metrics_are_exposed_as_prometheus_text(self):
+        label = uuid.uuid4().hex
+        metrics.LINKS_NEW.labels(domain=label).inc(4)
+
+        res = self.client.get(reverse("metrics"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res["Content-Type"].startswith("text/plain"))
+        self.assertIn(f'links_new_total{{domain="{label}"}} 4.0', res.content.decode())
+
+    @override_settings(METRICS_ALLOWED_IPS=["10.0.0.5"])
+    def test_only_allowed_servers_and_admins_read_metrics(self):
+        self.assertIn(self.client.get(reverse("metrics")).status_code, (401, 403))
+        self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="10.0.0.5").status_code, 200)
+
+        self.client.force_authenticate(get_user_model()(email="admin@example.com", is_superuser=True))
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
@@ -0,0 +1,87 @@
+import datetime as dt
+import io
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from app.models.link import Link
+from app.utils import nepali_date
+from app.utils.nepali_date import NEPAL_TZ, ad_to_bs, ad_to_bs_array, bs_to_ad, bs_to_ad_array, month_number
+
+
+class NepaliDateTest(SimpleTestCase):
+    def test_single_dates(self):
+        self.assertEqual(bs_to_ad(2000, 1, 1), dt.date(1943, 4, 14))
+        self.assertEqual(bs_to_ad(2080, 2, 15), dt.date(2023, 5, 29))
+        self.assertEqual(bs_to_ad(2080, 1, 1), dt.date(2023, 4, 14))
+        self.assertEqual(ad_to_bs(dt.date(2023, 5, 29)), (2080, 2, 15))
+        self.assertEqual(ad_to_bs(dt.date(2044, 4, 12)), (2100, 12, 30))
+
+        with self.assertRaises(ValueError):
+            bs_to_ad(2080, 2, 33)
+        with self.assertRaises(ValueError):
+            bs_to_ad(1999, 12, 1)
+        with self.assertRaises(ValueError):
+            ad_to_bs(dt.date(1900, 1, 1))
+
+    def test_every_day_round_trips_through_the_arrays(self):
+        days = np.arange(nepali_date.MONTH_STARTS[-1])
+        dates = np.datetime64(nepali_date.EPOCH, "D") + days.astype("timedelta64[D]")
+
+        years, months, month_days = ad_to_bs_array(dates)
+
+        np.testing.assert_array_equal(bs_to_ad_array(years, months, month_days), dates)
+        self.assertEqual((years[0], months[0], month_days[0]), (2000, 1, 1))
+        self.assertEqual((years[-1], months[-1], month_days[-1]), (2100, 12, 30))
+        # Single dates agree with the batch path
+        for index in (0, 12345, len(days) - 1):
+            self.assertEqual(ad_to_bs(dates[index].item()), (years[index], months[index], month_days[index]))
+
+    def test_invalid_dates_are_not_a_time(self):
+        dates = bs_to_ad_array([2080, 2080, 1999, 2080], [2, 2, 1, 13], [15, 33, 1, 1])
+
+        self.assertEqual(dates[0], np.datetime64("2023-05-29"))
+        self.assertTrue(np.isnat(dates[1:]).all())
+
+    def test_month_names(self):
+        self.assertEqual(month_number("जेठ"), 2)
+        self.assertEqual(month_number("जेष्ठ"), 2)
+        self.assertEqual(month_number("Chaitra"), 12)
+        self.assertEqual(month_number("०९"), 9)
+        with self.assertRaises(ValueError):
+            month_number("जनवरी")
+
+    def test_converters(self):
+        rows = [
+            {"year": "2080", "month_name": "जेठ", "day": "15", "hour": "10", "minute": "30"},
+            {"year": "2080", "month": "3", "day": "1"},
+            {"year": "2080", "month_name": "जनवरी", "day": "1"},
+        ]
+        expected = [dt.datetime(2023, 5, 29, 10, 30, tzinfo=NEPAL_TZ), dt.datetime(2023, 6, 16, tzinfo=NEPAL_TZ), None]
+
+        self.assertEqual(nepali_date.bikram_sambat_dates(rows), expected)
+        self.assertEqual([nepali_date.bikram_sambat_date(fields) for fields in rows], expected)
+        self.assertEqual(nepali_date.bikram_sambat_dates([]), [])
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+class ReindexDatesTest(TestCase):
+    def test_published_dates_are_normalised_per_site(self):
+        Link.objects.bulk_create([
+            Link(url="https://onlinekhabar.com/1", url_hash="1" * 64, source="onlinekhabar.com",
+                 status=Link.Status.SCRAPED, published_raw="जेठ १५, २०८० १०:३०"),
+            Link(url="https://onlinekhabar.com/2", url_hash="2" * 64, source="onlinekhabar.com",
+                 status=Link.Status.SCRAPED, published_raw="2023-06-20T10:15:00+05:45"),
+            Link(url="https://ekantipur.com/3", url_hash="3" * 64, source="ekantipur.com",
+                 status=Link.Status.SCRAPED, published_raw="अज्ञात"),
+        ])
+
+        out = io.StringIO()
+        call_command("reindex_news", "--dates", "--batch-size", "2", stdout=out)
+
+        published = dict(Link.objects.values_list("url_hash", "published_at"))
+        self.assertEqual(published["1" * 64], dt.datetime(2023, 5, 29, 10, 30, tzinfo=NEPAL_TZ))
+        self.assertEqual(published["2" * 64], dt.datetime(2023, 6, 20, 10, 15, tzinfo=NEPAL_TZ))
+        self.assertIsNone(published["3" * 64])
+        self.assertIn("2 news", out.getvalue())
@@ -0,0 +1,212 @@
+import asyncio
+import datetime as dt
+import gzip
+import json
+import tempfile
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.db import close_old_connections
+from django.test import override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from app.models.link import Link
+from app.models.user import User
+from app.utils.news_cache import invalidate_news
+
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class NewsApiTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.list_url = reverse("news_list")
+        start = timezone.make_aware(dt.datetime(2023, 6, 20, 6, 0))
+
+        links = []
+        for i in range(7):
+            links.append(Link(
+                url=f"https://ekantipur.com/news/2023/06/20/{i}",
+                url_hash=f"{i:064d}",
+                source="onlinekhabar.com" if i % 2 else "ekantipur.com",
+                status=Link.Status.SCRAPED,
+                title=f"News {i}",
+                body=f"Body {i}",
+                # Two news share each timestamp so the id breaks the tie
+                published_at=start + dt.timedelta(hours=i // 2),
+            ))
+        links.append(Link(url="https://ekantipur.com/pending", url_hash="p" * 64, source="ekantipur.com",
+                          published_at=start))
+        links.append(Link(url="https://ekantipur.com/old", url_hash="o" * 64, source="ekantipur.com",
+                          status=Link.Status.SCRAPED, published_at=start - dt.timedelta(days=1)))
+        Link.objects.bulk_create(links)
+
+    def get_page(self, **params):
+        params = {"date_from": "2023-06-20", "date_to": "2023-06-20", **params}
+        return self.client.get(self.list_url, params)
+
+    def test_pages_cover_the_date_range_without_overlap(self):
+        titles = []
+        cursor = None
+        while True:
+            params = {"limit": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.get_page(**params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            titles += [row["title"] for row in response.data["data"]]
+            cursor = response.data["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(titles, [f"News {i}" for i in (6, 5, 4, 3, 2, 1, 0)])
+
+    def test_body_is_only_returned_on_request(self):
+        response = self.get_page()
+        self.assertNotIn("body", response.data["data"][0])
+
+        response = self.get_page(include_body="true")
+        self.assertEqual(response.data["data"][0]["body"], "Body 6")
+
+    def test_filter_by_source(self):
+        response = self.get_page(source="onlinekhabar.com")
+        self.assertEqual([row["title"] for row in response.data["data"]], ["News 5", "News 3", "News 1"])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.get_page(cursor="garbage").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get_page(date_from="2023-06-21").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.list_url).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_detail(self):
+        link = Link.objects.get(title="News 2")
+
+        response = self.client.get(reverse("news_detail", kwargs={"news_id": link.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["body"], "Body 2")
+
+        pending = Link.objects.get(url="https://ekantipur.com/pending")
+        response = self.client.get(reverse("news_detail", kwargs={"news_id": pending.id}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_listing_is_cached_until_its_date_changes(self):
+        self.get_page()
+        with self.assertNumQueries(0):
+            self.get_page()
+
+        # A news scraped for another date leaves the cached listing alone
+        invalidate_news(0, timezone.make_aware(dt.datetime(2023, 6, 21, 12, 0)))
+        with self.assertNumQueries(0):
+            self.get_page()
+
+        link = Link.objects.get(title="News 6")
+        Link.objects.filter(id=link.id).update(title="Updated")
+        invalidate_news(link.id, link.published_at)
+
+        response = self.get_page()
+        self.assertEqual(response.data["data"][0]["title"], "Updated")
+
+    async def test_views_run_on_the_event_loop(self):
+        for name in ("news_list", "news_search"):
+            self.assertTrue(asyncio.iscoroutinefunction(resolve(reverse(name)).func))
+
+        response = await self.async_client.get(self.list_url, {"date_from": "2023-06-20", "date_to": "2023-06-20"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"][0]["title"], "News 6")
+
+    def test_detail_is_cached(self):
+        link = Link.objects.get(title="News 2")
+        url = reverse("news_detail", kwargs={"news_id": link.id})
+
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.client.get(url)
+
+    def export_token(self):
+        user = User.objects.create_user(email="reader@test.com", password="secret", is_active=True)
+        return str(AccessToken.for_user(user))
+
+    async def get_export(self, token, **params):
+        response = await self.async_client.get(
+            reverse("news_export"),
+            {"date_from": "2023-06-20", "date_to": "2023-06-20", **params},
+            AUTHORIZATION=f"Bearer {token}",
+        )
+        content = b"".join([chunk async for chunk in response.streaming_content])
+        return response, content
+
+    async def test_export_streams_ndjson_oldest_first(self):
+        token = await sync_to_async(self.export_token)()
+        response, content = await self.get_export(token)
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertTrue(response.is_async)
+        rows = [json.loads(line) for line in content.decode("utf-8").splitlines()]
+        self.assertEqual([row["title"] for row in rows], [f"News {i}" for i in range(7)])
+        self.assertEqual(rows[0]["body"], "Body 0")
+
+    async def test_export_can_be_gzipped(self):
+        token = await sync_to_async(self.export_token)()
+        _, plain = await self.get_export(token)
+        response, content = await self.get_export(token, compress="true")
+
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn(".ndjson.gz", response["Content-Disposition"])
+        self.assertEqual(gzip.decompress(content), plain)
+
+    async def test_export_streams_through_the_asgi_handler(self):
+        # The handler closes old connections when a request starts, which would
+        # close the connection holding the test transaction
+        request_started.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+
+        token = await sync_to_async(self.export_token)()
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": reverse("news_export"),
+            "query_string": b"date_from=2023-06-20&date_to=2023-06-20",
+            "headers": [(b"host", b"testserver"), (b"authorization", f"Bearer {token}".encode())],
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        # What daphne runs, the body is sent from the event loop
+        await ASGIHandler()(scope, receive, send)
+
+        self.assertEqual(messages[0]["status"], 200)
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        self.assertEqual(len(body.decode("utf-8").splitlines()), 7)
+
+    def test_export_streams_a_plain_generator_under_wsgi(self):
+        self.client.force_authenticate(User.objects.create_user(email="reader@test.com", password="secret", is_active=True))
+        response = self.client.get(reverse("news_export"), {"date_from": "2023-06-20", "date_to": "2023-06-20"})
+
+        # An async body would be collected into memory by the WSGI handler
+        self.assertFalse(response.is_async)
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 7)
+
+    def test_export_requires_login(self):
+        response = self.client.get(reverse("news_export"), {"date_from": "2023-06-20", "date_to": "2023-06-20"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_command_writes_file(self):
+        with tempfile.NamedTemporaryFile(suffix=".ndjson.gz") as output:
+            call_command("export_news", "2023-06-19", "2023-06-20", "--gzip", "--chunk-size", "2", "-o", output.name,
+                         source="ekantipur.com")
+            lines = gzip.decompress(output.read()).decode("utf-8").splitlines()
+
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])["url"], "https://ekantipur.com/old")
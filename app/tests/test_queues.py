@@ -0,0 +1,76 @@
+import datetime as dt
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from app.models.link import Link
+from app.tasks.rescrape_failed_task import rescrape_failed_task
+from app.tasks.scrape_article_task import scrape_article, scrape_articles_batch
+from config import celery_app
+from config.celery import WORKER_QUEUES, worker_argv
+
+
+class QueueRoutingTest(SimpleTestCase):
+    def route(self, task_name):
+        return celery_app.amqp.router.route({}, task_name)
+
+    def test_tasks_are_routed_to_their_queue(self):
+        routes = {
+            "app.tasks.aggrigate_links_task.aggrigate_links_task": "discovery",
+            "app.tasks.scrape_article_task.scrape_article": "scrape",
+            "app.tasks.send_email_task.send_email": "email",
+        }
+        for task_name, queue in routes.items():
+            with self.subTest(task_name):
+                self.assertEqual(self.route(task_name)["queue"].name, queue)
+
+    def test_discovery_outranks_scraping(self):
+        discovery = self.route("app.tasks.aggrigate_links_task.aggrigate_links_task")
+        scrape = self.route("app.tasks.scrape_article_task.scrape_article")
+
+        self.assertLess(discovery["priority"], scrape["priority"])
+
+    def test_every_routed_queue_has_a_worker(self):
+        queues = {route["queue"] for route in celery_app.conf.task_routes.values()}
+        self.assertEqual(queues, set(WORKER_QUEUES))
+
+    def test_worker_gets_the_options_of_its_queue(self):
+        argv = worker_argv("scrape")
+
+        self.assertEqual(argv[argv.index("--queues") + 1], "scrape")
+        self.assertEqual(argv[argv.index("--concurrency") + 1], "8")
+        self.assertEqual(argv[argv.index("--prefetch-multiplier") + 1], "1")
+
+    def test_scrape_results_are_not_stored(self):
+        self.assertTrue(scrape_article.ignore_result)
+        self.assertTrue(scrape_articles_batch.ignore_result)
+
+
+class RescrapeFailedTest(TestCase):
+    def test_failed_links_go_to_rescrape_queue(self):
+        failed = Link.objects.create(url="https://ekantipur.com/1", url_hash="1" * 64, source="ekantipur.com",
+                                     status=Link.Status.FAILED)
+        Link.objects.filter(id=failed.id).update(updated_at=timezone.now() - dt.timedelta(hours=1))
+        Link.objects.create(url="https://ekantipur.com/2", url_hash="2" * 64, source="ekantipur.com",
+                            status=Link.Status.FAILED)
+        given_up = Link.objects.create(url="https://ekantipur.com/3", url_hash="3" * 64, source="ekantipur.com",
+                                       status=Link.Status.FAILED, scrape_attempts=5)
+        Link.objects.filter(id=given_up.id).update(updated_at=timezone.now() - dt.timedelta(hours=1))
+
+        with mock.patch.object(scrape_article, "apply_async") as apply_async:
+            # The undecorated task, the lock of singleton_task is tested in test_locks
+            rescrape_failed_task.run.__wrapped__()
+
+        apply_async.assert_called_once_with((failed.id,), queue="rescrape", priority=9)
+
+    def test_stale_pending_links_are_queued_once(self):
+        stale = Link.objects.create(url="https://ekantipur.com/1", url_hash="1" * 64, source="ekantipur.com")
+        Link.objects.filter(id=stale.id).update(updated_at=timezone.now() - dt.timedelta(hours=1))
+        Link.objects.create(url="https://ekantipur.com/2", url_hash="2" * 64, source="ekantipur.com")
+
+        with mock.patch.object(scrape_article, "apply_async") as apply_async:
+            rescrape_failed_task.run.__wrapped__()
+            rescrape_failed_task.run.__wrapped__()
+
+        apply_async.assert_called_once_with((stale.id,), queue="rescrape", priority=9)
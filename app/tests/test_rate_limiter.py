@@ -0,0 +1,63 @@
+from unittest import mock
+
+from celery.exceptions import Retry
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from app.models.link import Link
+from app.tasks import scrape_article_task
+from app.tasks.scrape_article_task import scrape_article
+from app.utils import rate_limiter, scrapers
+from app.utils.rate_limiter import RateLimited
+
+
+@override_settings(CRAWL_RATE_LIMITS={"default": (1, 2), "ekantipur.com": (0.2, 1)}, CRAWL_RESPECT_ROBOTS=True)
+class RateLimiterTest(SimpleTestCase):
+    def test_domain_rate_uses_override(self):
+        with mock.patch.object(rate_limiter, "robots_crawl_delay", return_value=0):
+            self.assertEqual(rate_limiter.domain_rate("https://www.onlinekhabar.com/news"), (1, 2))
+            self.assertEqual(rate_limiter.domain_rate("https://ekantipur.com/news"), (0.2, 1))
+
+    def test_robots_crawl_delay_lowers_rate(self):
+        with mock.patch.object(rate_limiter, "robots_crawl_delay", return_value=10):
+            self.assertEqual(rate_limiter.domain_rate("https://www.onlinekhabar.com/news"), (0.1, 2))
+
+    def test_short_wait_is_slept(self):
+        with mock.patch.object(rate_limiter, "try_acquire", side_effect=[0.5, 0]), \
+                mock.patch.object(rate_limiter.time, "sleep") as sleep:
+            rate_limiter.throttle("https://ekantipur.com/news", max_wait=2)
+
+        sleep.assert_called_once_with(0.5)
+
+    def test_long_wait_raises(self):
+        with mock.patch.object(rate_limiter, "try_acquire", return_value=30):
+            with self.assertRaises(RateLimited) as raised:
+                rate_limiter.throttle("https://ekantipur.com/news", max_wait=2)
+
+        self.assertEqual(raised.exception.domain, "ekantipur.com")
+        self.assertEqual(raised.exception.retry_after, 30)
+
+    def test_fetch_is_throttled_before_request(self):
+        with mock.patch.object(scrapers, "throttle", side_effect=RateLimited("ekantipur.com", 30)), \
+                mock.patch.object(scrapers, "get_http_session") as get_http_session:
+            with self.assertRaises(RateLimited):
+                scrapers.fetch_http("https://ekantipur.com/news")
+
+        get_http_session.assert_not_called()
+
+
+class ScrapeArticleRetryTest(TestCase):
+    def test_rate_limited_article_is_retried_later(self):
+        link = Link.objects.create(
+            url="https://ekantipur.com/news/2023/06/01/1234.html",
+            url_hash="b" * 64,
+            source="ekantipur.com",
+        )
+
+        with mock.patch.object(scrape_article_task, "scrape_link", side_effect=RateLimited("ekantipur.com", 12)), \
+                mock.patch.object(scrape_article, "retry", side_effect=Retry()) as retry:
+            with self.assertRaises(Retry):
+                scrape_article(link.id)
+
+        retry.assert_called_once_with(countdown=12)
+        link.refresh_from_db()
+        self.assertEqual(link.status, Link.Status.PENDING)
@@ -0,0 +1,64 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from app.utils import scrapers
+from app.utils.scrapers import FetchResult
+
+RENDERED_PAGE = "<html><body>" + '<a href="/news/1">News</a>' * 200 + "</body></html>"
+
+
+@override_settings(
+    SCRAPER_JS_REQUIRED=[r"^https://spa\.example\.com/"],
+    SCRAPER_MIN_CONTENT_LENGTH=1024,
+    CRAWL_RATE_LIMIT_ENABLED=False,
+)
+class ScrapeTest(SimpleTestCase):
+    def test_server_rendered_page_uses_http(self):
+        with mock.patch.object(scrapers, "fetch_http", return_value=FetchResult(RENDERED_PAGE)), \
+                mock.patch.object(scrapers, "fetch_selenium") as fetch_selenium:
+            page_source = scrapers.scrape("https://www.onlinekhabar.com")
+
+        self.assertEqual(page_source, RENDERED_PAGE)
+        fetch_selenium.assert_not_called()
+
+    def test_incomplete_page_falls_back_to_selenium(self):
+        with mock.patch.object(scrapers, "fetch_http", return_value=FetchResult("<html><body></body></html>")), \
+                mock.patch.object(scrapers, "fetch_selenium", return_value=RENDERED_PAGE) as fetch_selenium:
+            page_source = scrapers.scrape("https://ekantipur.com")
+
+        self.assertEqual(page_source, RENDERED_PAGE)
+        fetch_selenium.assert_called_once_with("https://ekantipur.com", throttled=True)
+
+    def test_selenium_fallback_is_throttled_once(self):
+        response = mock.Mock(status_code=404, headers={"Content-Type": "text/html"})
+        pool = mock.MagicMock()
+        pool.session.return_value.__enter__.return_value.execute_script.return_value = RENDERED_PAGE
+
+        with mock.patch.object(scrapers, "throttle") as throttle, \
+                mock.patch.object(scrapers, "get_http_session", return_value=mock.Mock(**{"get.return_value": response})), \
+                mock.patch.object(scrapers, "get_driver_pool", return_value=pool):
+            page_source = "".join(scrapers.fetch_stream("https://ekantipur.com/news/1"))
+
+        self.assertEqual(page_source, RENDERED_PAGE)
+        throttle.assert_called_once_with("https://ekantipur.com/news/1")
+
+    def test_js_required_url_skips_http(self):
+        with mock.patch.object(scrapers, "fetch_http") as fetch_http, \
+                mock.patch.object(scrapers, "fetch_selenium", return_value=RENDERED_PAGE):
+            scrapers.scrape("https://spa.example.com/news")
+
+        fetch_http.assert_not_called()
+
+    def test_not_modified_page_is_not_escalated(self):
+        response = mock.Mock(status_code=304, headers={})
+        session = mock.Mock(**{"get.return_value": response})
+
+        with mock.patch.object(scrapers, "get_http_session", return_value=session), \
+                mock.patch.object(scrapers, "fetch_selenium") as fetch_selenium:
+            result = scrapers.fetch("https://ekantipur.com", etag='"abc"')
+
+        self.assertTrue(result.not_modified)
+        self.assertIsNone(result.page_source)
+        self.assertEqual(session.get.call_args.kwargs["headers"], {"If-None-Match": '"abc"'})
+        fetch_selenium.assert_not_called()
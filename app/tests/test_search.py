@@ -0,0 +1,61 @@
+import datetime as dt
+import io
+import unittest
+
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from django.test import SimpleTestCase
+from rest_framework.test import APITestCase
+
+from app.models.link import Link
+from app.utils.devanagari import tokenize, tsquery_literal, tsvector_literal
+
+
+class DevanagariTokenizerTest(SimpleTestCase):
+    def test_words_keep_their_vowel_signs(self):
+        self.assertEqual(tokenize("काठमाडौंमा भारी वर्षा।"), ["काठमाडौं", "भारी", "वर्षा"])
+
+    def test_postpositions_and_stopwords_are_removed(self):
+        self.assertEqual(tokenize("नेपालको राजधानी र प्रदेशहरूमा"), ["नेपाल", "राजधानी", "प्रदेश"])
+
+    def test_nouns_ending_like_verbs_are_kept_whole(self):
+        self.assertEqual(tokenize("योजना घटना सूचना रचना"), ["योजना", "घटना", "सूचना", "रचना"])
+        self.assertEqual(tokenize("योजनाको घटनामा"), ["योजना", "घटना"])
+
+    def test_zero_width_joiners_are_ignored(self):
+        self.assertEqual(tokenize("नेपा‍ल"), tokenize("नेपाल"))
+
+    def test_vector_and_query_literals(self):
+        self.assertEqual(
+            tsvector_literal(("भारी वर्षा", "A"), ("वर्षा जारी", "B")),
+            "'भारी':1A 'वर्षा':2A,3B 'जारी':4B",
+        )
+        self.assertEqual(tsquery_literal("वर्षाको भारी"), "'वर्षा':* & 'भारी':*")
+        self.assertEqual(tsquery_literal("र छ"), "")
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "full text search needs postgres")
+class NewsSearchTest(APITestCase):
+    def setUp(self):
+        published_at = timezone.make_aware(dt.datetime(2023, 6, 20, 10, 0))
+        Link.objects.bulk_create([
+            Link(url="https://ekantipur.com/1", url_hash="1" * 64, source="ekantipur.com", published_at=published_at,
+                 status=Link.Status.SCRAPED, title="काठमाडौंमा भारी वर्षा", body="उपत्यकामा बाढीको खतरा"),
+            Link(url="https://ekantipur.com/2", url_hash="2" * 64, source="ekantipur.com", published_at=published_at,
+                 status=Link.Status.SCRAPED, title="बजेट सार्वजनिक", body="काठमाडौं महानगरको बजेट"),
+            Link(url="https://ekantipur.com/3", url_hash="3" * 64, source="ekantipur.com", published_at=published_at,
+                 status=Link.Status.SCRAPED, title="क्रिकेट", body="नेपाल विजयी"),
+        ])
+        call_command("reindex_news", stdout=io.StringIO())
+
+    def test_title_matches_rank_first(self):
+        response = self.client.get(reverse("news_search"), {"q": "काठमाडौं"})
+
+        self.assertEqual([row["title"] for row in response.data["data"]], ["काठमाडौंमा भारी वर्षा", "बजेट सार्वजनिक"])
+
+    def test_all_keywords_must_match(self):
+        response = self.client.get(reverse("news_search"), {"q": "काठमाडौंको बजेट"})
+
+        self.assertEqual([row["title"] for row in response.data["data"]], ["बजेट सार्वजनिक"])
@@ -0,0 +1,65 @@
+import datetime as dt
+import tempfile
+
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from django.test import TestCase
+from django.utils import timezone
+
+from app.models.link import Link
+from app.services.snapshot_service import partition_path, write_snapshots
+
+JUNE_20 = dt.date(2023, 6, 20)
+JUNE_21 = dt.date(2023, 6, 21)
+
+
+class SnapshotTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+
+        overridden = self.settings(NEWS_SNAPSHOT_ROOT=self.root)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+
+        for i, day in enumerate([JUNE_20, JUNE_20, JUNE_21]):
+            Link.objects.create(
+                url=f"https://ekantipur.com/news/{i}",
+                url_hash=f"{i:064d}",
+                source="ekantipur.com",
+                status=Link.Status.SCRAPED,
+                title=f"News {i}",
+                body=f"Body {i}",
+                # late evening in Kathmandu is already the next day in UTC
+                published_at=timezone.make_aware(dt.datetime.combine(day, dt.time(23, 30))),
+            )
+
+    def test_days_are_partitioned_by_local_date(self):
+        self.assertEqual(write_snapshots(), [JUNE_20, JUNE_21])
+
+        table = pq.read_table(partition_path(JUNE_20) / "part-0.parquet")
+        self.assertEqual(table.column("title").to_pylist(), ["News 0", "News 1"])
+
+        dataset = ds.dataset(self.root, format="parquet", partitioning="hive")
+        self.assertEqual(dataset.count_rows(), 3)
+
+    def test_only_changed_days_are_rewritten(self):
+        write_snapshots()
+        self.assertEqual(write_snapshots(), [])
+
+        link = Link.objects.get(title="News 2")
+        link.title = "Updated"
+        link.save()
+
+        self.assertEqual(write_snapshots(), [JUNE_21])
+        table = pq.read_table(partition_path(JUNE_21) / "part-0.parquet")
+        self.assertEqual(table.column("title").to_pylist(), ["Updated"])
+
+    def test_day_without_news_is_removed(self):
+        write_snapshots()
+        Link.objects.filter(title="News 2").update(status=Link.Status.INVALID)
+
+        self.assertEqual(write_snapshots(), [])
+        self.assertFalse(partition_path(JUNE_21).exists())
+        self.assertEqual(write_snapshots(full=True), [JUNE_20])
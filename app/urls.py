@@ -3,6 +3,8 @@ from rest_framework_simplejwt.views import TokenRefreshView
 
 from app.api.account import RegisterView, ObtainTokenPairView, LogoutView, ChangePasswordView, ForgotPasswordView, \
     VerifyResetTokenView, ResetPasswordView, ActivateUserView, UserDetailsView
+from app.api.metrics import MetricsView
+from app.api.news import NewsListView, NewsSearchView, NewsDetailView, NewsExportView
 
 
 urlpatterns = [
@@ -19,4 +21,13 @@ urlpatterns = [
     path('core/auth/activate-user/<str:uidb64>/<str:token>/', ActivateUserView.as_view(), name='activate'),
 
     path('core/auth/me/', UserDetailsView.as_view(), name='user_details'),
+
+    # news
+    path('news/', NewsListView.as_view(), name='news_list'),
+    path('news/search/', NewsSearchView.as_view(), name='news_search'),
+    path('news/export/', NewsExportView.as_view(), name='news_export'),
+    path('news/<int:news_id>/', NewsDetailView.as_view(), name='news_detail'),
+
+    # monitoring
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+from app.utils.rate_limiter import RateLimited
+from app.utils.scrapers import scrape
+
+logger = logging.getLogger(__name__)
+
+
+async def crawl_async(urls, fetch, executor, per_host_limit, timeout):
+    """
+    Fetch every url concurrently and return `{url: page_source}`.
+
+    At most `per_host_limit` requests run against the same host at a time. Urls
+    that fail or are still running after `timeout` seconds map to None, so a
+    slow portal only loses its own result. A rate limited url waits for its
+    domain without holding an executor thread and is tried again.
+    """
+    loop = asyncio.get_running_loop()
+    host_limits = defaultdict(lambda: asyncio.Semaphore(per_host_limit))
+
+    async def fetch_one(url):
+        while True:
+            try:
+                async with host_limits[urlsplit(url).hostname]:
+                    return await loop.run_in_executor(executor, fetch, url)
+            except RateLimited as exc:
+                await asyncio.sleep(exc.retry_after)
+
+    tasks = {asyncio.create_task(fetch_one(url)): url for url in urls}
+    if not tasks:
+        return {}
+
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+    for task in pending:
+        task.cancel()
+        logger.warning(f"Crawl of {tasks[task]} did not finish in {timeout}s")
+
+    results = {}
+    for task, url in tasks.items():
+        if task in done and task.exception() is None:
+            results[url] = task.result()
+        else:
+            if task in done:
+                logger.warning(f"Crawl of {url} failed", exc_info=task.exception())
+            results[url] = None
+    return results
+
+
+def crawl(urls, fetch=scrape, per_host_limit=None, timeout=None):
+    """Blocking entry point of `crawl_async` for celery tasks."""
+    urls = list(dict.fromkeys(urls))
+    per_host_limit = per_host_limit or settings.CRAWLER_PER_HOST_LIMIT
+    timeout = timeout or settings.CRAWLER_TIMEOUT
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(len(urls), settings.CRAWLER_MAX_WORKERS)),
+        thread_name_prefix="crawler",
+    )
+    try:
+        return asyncio.run(crawl_async(urls, fetch, executor, per_host_limit, timeout))
+    finally:
+        # Do not wait for fetches that overran the timeout, they finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
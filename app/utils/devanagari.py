@@ -0,0 +1,83 @@
+import re
+import unicodedata
+
+# Word characters plus the Devanagari block, so vowel signs, virama and anusvara stay inside
+# the word. The danda (U+0964, U+0965) ends a sentence and is not part of a word.
+TOKEN = re.compile(r"[\w\u0900-\u0963\u0966-\u097F]+")
+
+# Devanagari digits to ascii, for dates and numbers in article text
+DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+
+# Zero width (non) joiners and the nukta only change the rendering of a word
+IGNORED_CHARACTERS = dict.fromkeys(map(ord, "\u200c\u200d\u093c"))
+
+# Postpositions and plural markers written together with the noun, longest first. Verb
+# endings like ना, नु and ने are left alone, they also end nouns such as योजना and घटना
+SUFFIXES = sorted(
+    ["हरूको", "हरूले", "हरूलाई", "हरूमा", "हरूबाट", "हरू", "हरु", "लाई", "बाट", "देखि", "सम्म", "भन्दा",
+     "को", "का", "की", "ले", "मा"],
+    key=len,
+    reverse=True,
+)
+
+STOPWORDS = {
+    "र", "छ", "छन्", "हो", "पनि", "यो", "त्यो", "यस", "उक्त", "भने", "तथा", "वा", "गरेको", "गर्ने",
+    "भएको", "रहेको", "थियो", "हुने", "लागि", "अनुसार", "गरी", "एक", "नै", "the", "and", "of", "a", "to",
+}
+
+# Postgres keeps positions up to 16383 and at most 256 positions per lexeme
+MAX_POSITION = 16383
+MAX_POSITIONS_PER_LEXEME = 256
+
+
+def normalize_text(text):
+    return unicodedata.normalize("NFC", text).translate(IGNORED_CHARACTERS).lower()
+
+
+def to_ascii_digits(text):
+    return text.translate(DIGITS)
+
+
+def stem(token):
+    """Strip one attached postposition, e.g. नेपालको -> नेपाल, keeping at least two characters."""
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text):
+    """Normalized, stemmed search terms of `text`, stopwords removed."""
+    return [
+        stem(token)
+        for token in TOKEN.findall(normalize_text(text))
+        if token not in STOPWORDS
+    ]
+
+
+def _quote(lexeme):
+    return "'" + lexeme.replace("\\", "\\\\").replace("'", "''") + "'"
+
+
+def tsvector_literal(*weighted_texts):
+    """
+    Build a postgres tsvector literal from (text, weight) pairs.
+
+    The lexemes come from `tokenize`, postgres only stores them. Its own parser
+    splits Devanagari words at every vowel sign under most locales.
+    """
+    positions = {}
+    position = 0
+    for text, weight in weighted_texts:
+        for token in tokenize(text or ""):
+            position = min(position + 1, MAX_POSITION)
+            entries = positions.setdefault(token, [])
+            if len(entries) < MAX_POSITIONS_PER_LEXEME:
+                entries.append(f"{position}{weight}")
+
+    return " ".join(f"{_quote(lexeme)}:{','.join(entries)}" for lexeme, entries in positions.items())
+
+
+def tsquery_literal(query):
+    """All terms of the query must match, each as a prefix so unstemmed inflections still match."""
+    return " & ".join(f"{_quote(token)}:*" for token in dict.fromkeys(tokenize(query)))
@@ -0,0 +1,165 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+from django.conf import settings
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from app.utils.metrics import SELENIUM_SESSION_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def create_remote_driver():
+    """Open a new Firefox session on the remote Selenium host."""
+    firefox_options = webdriver.FirefoxOptions()
+    driver = webdriver.Remote(
+        command_executor=settings.SELENIUM_HOST,
+        options=firefox_options
+    )
+    driver.set_page_load_timeout(settings.SELENIUM_PAGE_LOAD_TIMEOUT)
+    return driver
+
+
+class PooledDriver:
+    """A Selenium session together with its bookkeeping inside the pool."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+        self.broken = False
+
+
+class DriverPool:
+    """
+    Bounded pool of reusable Selenium sessions.
+
+    Sessions are created lazily up to `size`, health-checked before being handed
+    out and recycled after `max_pages` page loads or when a caller hits a
+    WebDriverException while using them.
+    """
+
+    def __init__(self, size, max_pages, factory=create_remote_driver, acquire_timeout=None):
+        self.size = size
+        self.max_pages = max_pages
+        self.factory = factory
+        self.acquire_timeout = acquire_timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _is_healthy(self, pooled):
+        if pooled.broken or pooled.pages >= self.max_pages:
+            return False
+        try:
+            pooled.driver.execute_script("return 1;")
+        except WebDriverException:
+            return False
+        return True
+
+    def _discard(self, pooled):
+        try:
+            pooled.driver.quit()
+        except Exception:
+            logger.debug("Failed to quit selenium session cleanly", exc_info=True)
+
+    def _checkout(self):
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise TimeoutError("Timed out waiting for a free selenium session")
+
+        try:
+            while True:
+                try:
+                    pooled = self._idle.get_nowait()
+                except queue.Empty:
+                    with SELENIUM_SESSION_SECONDS.time():
+                        return PooledDriver(self.factory())
+
+                if self._is_healthy(pooled):
+                    return pooled
+                self._discard(pooled)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _checkin(self, pooled):
+        try:
+            if self._closed or pooled.broken or pooled.pages >= self.max_pages:
+                self._discard(pooled)
+            else:
+                self._idle.put(pooled)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def session(self):
+        """Borrow a driver for the duration of the `with` block."""
+        pooled = self._checkout()
+        try:
+            yield pooled.driver
+        except WebDriverException:
+            # The session may be dead on the grid side, never hand it out again
+            pooled.broken = True
+            raise
+        finally:
+            pooled.pages += 1
+            self._checkin(pooled)
+
+    def close(self):
+        """Quit every idle session and refuse further checkouts."""
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    pooled = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._discard(pooled)
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Return the driver pool of the current process, creating it on first use."""
+    global _pool, _pool_pid
+
+    # Prefork workers inherit module state from the parent, sessions must never
+    # be shared across processes so a new pool is built after every fork.
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = DriverPool(
+                    size=settings.SELENIUM_POOL_SIZE,
+                    max_pages=settings.SELENIUM_MAX_PAGES_PER_SESSION,
+                    acquire_timeout=settings.SELENIUM_POOL_TIMEOUT,
+                )
+                _pool_pid = pid
+    return _pool
+
+
+def close_driver_pool(**kwargs):
+    global _pool
+
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.close()
+        _pool = None
+
+
+worker_process_shutdown.connect(close_driver_pool, weak=False)
+worker_shutdown.connect(close_driver_pool, weak=False)
+atexit.register(close_driver_pool)
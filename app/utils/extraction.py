@@ -0,0 +1,244 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+from django.utils import dateparse, timezone
+
+from app.utils.urls import normalize_url, site_of
+
+WHITESPACE = re.compile(r"\s+")
+
+
+class LinkParser(HTMLParser):
+    """Collects the href of every anchor while the page is fed to the parser."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hrefs = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            href = dict(attrs).get("href")
+            if href:
+                self.hrefs.append(href)
+
+
+class ArticleParser(LinkParser):
+    """
+    Event based parser pulling the title, published date, body and links of an article.
+
+    Only the extracted text is kept, the page itself is never held in memory, so
+    the page can be fed chunk by chunk as it arrives from the network. With the
+    compiled `rules` of a site extractor the selected elements are used, anything
+    the rules do not find falls back to og:title, article:published_time and the
+    paragraphs inside <article>.
+    """
+
+    SKIP_TAGS = {"script", "style", "noscript", "template"}
+    VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+    def __init__(self, rules=None):
+        super().__init__()
+        self.rules = rules
+        self.meta = {}
+        self.time_datetime = None
+        self._title = []
+        self._heading = []
+        self._paragraphs = []
+        self._paragraph = None
+        self._in_title = False
+        self._in_heading = False
+        self._skip_depth = 0
+        self._article_depth = 0
+        # Open elements and the fields being captured from them, only tracked with rules
+        self._stack = []
+        self._captures = {}
+        self._captured = {}
+        self._body_paragraphs = []
+
+    def _match_rules(self, tag, attrs):
+        element = (tag, attrs, frozenset(attrs.get("class", "").split()))
+        void = tag in self.VOID_TAGS
+        self._stack.append(element)
+
+        for field in ("title", "published", "body"):
+            selector = getattr(self.rules, field)
+            if selector is None or field in self._captured or field in self._captures:
+                continue
+            if not selector.matches(self._stack):
+                continue
+
+            value = (attrs.get("datetime") or attrs.get("content")) if field == "published" else None
+            if value:
+                self._captured[field] = clean_text(value)
+            elif not void:
+                self._captures[field] = (len(self._stack), [])
+
+        if void:
+            self._stack.pop()
+
+    def _close_element(self, tag):
+        if tag not in (element[0] for element in self._stack):
+            return
+
+        # Unclosed children (e.g. <li> without </li>) are closed together with their parent
+        while self._stack:
+            if self._stack.pop()[0] == tag:
+                break
+
+        for field, (depth, texts) in list(self._captures.items()):
+            if depth > len(self._stack):
+                self._captured[field] = clean_text("".join(texts))
+                del self._captures[field]
+
+    def handle_starttag(self, tag, attrs):
+        super().handle_starttag(tag, attrs)
+        attrs = {name: value or "" for name, value in attrs}
+
+        if self.rules is not None:
+            self._match_rules(tag, attrs)
+
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "meta":
+            key = attrs.get("property") or attrs.get("name")
+            if key and attrs.get("content"):
+                self.meta.setdefault(key.lower(), attrs["content"])
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "h1":
+            self._in_heading = True
+        elif tag == "article":
+            self._article_depth += 1
+        elif tag == "p":
+            self._paragraph = []
+        elif tag == "br" and self._paragraph is not None:
+            self._paragraph.append(" ")
+        elif tag == "time" and self.time_datetime is None:
+            self.time_datetime = attrs.get("datetime")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag == "h1":
+            self._in_heading = False
+        elif tag == "article":
+            self._article_depth = max(0, self._article_depth - 1)
+        elif tag == "p" and self._paragraph is not None:
+            text = clean_text("".join(self._paragraph))
+            if text:
+                self._paragraphs.append((self._article_depth > 0, text))
+                if "body" in self._captures:
+                    self._body_paragraphs.append(text)
+            self._paragraph = None
+
+        if self.rules is not None:
+            self._close_element(tag)
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self._title.append(data)
+        if self._in_heading:
+            self._heading.append(data)
+        if self._paragraph is not None:
+            self._paragraph.append(data)
+        for _, texts in self._captures.values():
+            texts.append(data)
+
+    @property
+    def title(self):
+        return self._captured.get("title") or clean_text(
+            self.meta.get("og:title") or "".join(self._heading) or "".join(self._title)
+        )
+
+    @property
+    def published_raw(self):
+        return self._captured.get("published") or clean_text(
+            self.meta.get("article:published_time") or self.time_datetime or ""
+        )
+
+    @property
+    def body(self):
+        if self._body_paragraphs:
+            return "\n\n".join(self._body_paragraphs)
+        if self._captured.get("body"):
+            return self._captured["body"]
+
+        # Paragraphs inside <article> win over the ones in sidebars and footers
+        in_article = [text for inside, text in self._paragraphs if inside]
+        return "\n\n".join(in_article or [text for _, text in self._paragraphs])
+
+
+class Article:
+    def __init__(self, title, published_raw, published_at, body, links):
+        self.title = title
+        self.published_raw = published_raw
+        self.published_at = published_at
+        self.body = body
+        self.links = links
+
+
+def clean_text(text):
+    return WHITESPACE.sub(" ", text).strip()
+
+
+def parse_published_at(published_raw):
+    """Parse an ISO 8601 published date, naive values are taken as local time."""
+    try:
+        published_at = dateparse.parse_datetime(published_raw)
+    except ValueError:
+        return None
+    if published_at is not None and timezone.is_naive(published_at):
+        published_at = timezone.make_aware(published_at)
+    return published_at
+
+
+def filter_links(hrefs, base_url):
+    """Return the normalized, de-duplicated links of `hrefs` that stay on the site of `base_url`."""
+    site = site_of(base_url)
+    links = {}
+    for href in hrefs:
+        url = urljoin(base_url, href.strip())
+        if urlsplit(url).scheme not in ("http", "https") or site_of(url) != site:
+            continue
+        links[normalize_url(url)] = None
+    return list(links)
+
+
+def extract_links(page_source, base_url, extractor=None):
+    """Same-site links of a page, limited to the article urls of `extractor` when given."""
+    parser = LinkParser()
+    parser.feed(page_source)
+    parser.close()
+
+    links = filter_links(parser.hrefs, base_url)
+    if extractor is not None:
+        links = [url for url in links if extractor.is_article_url(url)]
+    return links
+
+
+def parse_article(chunks, base_url, raw_sink=None, rules=None):
+    """
+    Extract an Article from an iterable of html chunks.
+
+    Each chunk is parsed and optionally written to `raw_sink` as soon as it
+    arrives, so memory use does not grow with the size of the page.
+    """
+    parser = ArticleParser(rules)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if raw_sink is not None:
+            raw_sink.write(chunk)
+    parser.close()
+
+    return Article(
+        title=parser.title,
+        published_raw=parser.published_raw,
+        published_at=(rules.parse_published if rules else parse_published_at)(parser.published_raw),
+        body=parser.body,
+        links=filter_links(parser.hrefs, base_url),
+    )
@@ -0,0 +1,107 @@
+import gzip
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class ArchiveWriter:
+    """
+    Streams html into the archive.
+
+    Text is hashed and compressed chunk by chunk, `commit` stores the blob under
+    its sha256 and returns the hash.
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+        self._digest = hashlib.sha256()
+        self._file = tempfile.NamedTemporaryFile(dir=archive.tmp_dir, suffix=".tmp", delete=False)
+        self._gzip = gzip.GzipFile(fileobj=self._file, mode="wb", mtime=0)
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        self._digest.update(data)
+        self._gzip.write(data)
+
+    def commit(self):
+        self._gzip.close()
+        self._file.close()
+        content_hash = self._digest.hexdigest()
+        self.archive.store(content_hash, self._file.name)
+        return content_hash
+
+    def discard(self):
+        self._gzip.close()
+        self._file.close()
+        os.unlink(self._file.name)
+
+
+class HtmlArchive(ABC):
+    """
+    Interface of the raw html stores configured by HTML_ARCHIVE_BACKEND, blobs
+    are gzip compressed and keyed by sha256 of the html.
+    """
+
+    tmp_dir = None
+
+    def writer(self):
+        return ArchiveWriter(self)
+
+    @abstractmethod
+    def store(self, content_hash, compressed_path):
+        """Move the compressed file at `compressed_path` into the archive under `content_hash`."""
+
+    @abstractmethod
+    def open(self, content_hash):
+        """Return a binary file object of the compressed blob."""
+
+    @abstractmethod
+    def exists(self, content_hash):
+        """Whether a blob is stored under `content_hash`."""
+
+    def read(self, content_hash):
+        with self.open(content_hash) as blob:
+            return gzip.decompress(blob.read()).decode("utf-8")
+
+
+class FileSystemArchive(HtmlArchive):
+    """Stores blobs on the local filesystem as <root>/ab/cd/<hash>.html.gz"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.tmp_dir = self.root / "tmp"
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, content_hash):
+        return self.root / content_hash[:2] / content_hash[2:4] / f"{content_hash}.html.gz"
+
+    def store(self, content_hash, compressed_path):
+        path = self.path(content_hash)
+        if path.exists():
+            # Identical page was archived before, nothing to write
+            os.unlink(compressed_path)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(compressed_path, path)
+
+    def open(self, content_hash):
+        return open(self.path(content_hash), "rb")
+
+    def exists(self, content_hash):
+        return self.path(content_hash).exists()
+
+
+_archives = {}
+
+
+def get_html_archive():
+    """Archive configured by HTML_ARCHIVE_BACKEND and HTML_ARCHIVE_OPTIONS."""
+    key = (settings.HTML_ARCHIVE_BACKEND, tuple(sorted(settings.HTML_ARCHIVE_OPTIONS.items())))
+    if key not in _archives:
+        _archives[key] = import_string(settings.HTML_ARCHIVE_BACKEND)(**settings.HTML_ARCHIVE_OPTIONS)
+    return _archives[key]
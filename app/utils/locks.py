@@ -0,0 +1,62 @@
+import functools
+import logging
+import math
+import uuid
+
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Only the holder of the lock may release it, a lock which expired and was taken
+# by another worker in the meantime is left alone
+RELEASE = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisLock:
+    """Lock shared by all workers, expiring after `timeout` seconds in case its holder dies."""
+
+    def __init__(self, name, timeout, redis=None):
+        self.key = f"lock:{name}"
+        # redis only accepts whole seconds, timeouts read with env.float are rounded up
+        self.timeout = int(math.ceil(timeout))
+        self.redis = redis or get_redis()
+        self.token = uuid.uuid4().hex
+
+    def acquire(self):
+        return bool(self.redis.set(self.key, self.token, nx=True, ex=self.timeout))
+
+    def release(self):
+        return bool(self.redis.eval(RELEASE, 1, self.key, self.token))
+
+
+def singleton_task(timeout):
+    """
+    Skip a run of the decorated task while a previous run still holds its lock.
+
+    Used below `celery_app.task()` so beat entries firing faster than the task
+    finishes never crawl the same pages in parallel. `timeout` must be longer
+    than the slowest run.
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            lock = RedisLock(name, timeout)
+            if not lock.acquire():
+                logger.info(f"Skipping {name}, the previous run is still going")
+                return None
+            try:
+                return func(*args, **kwargs)
+            finally:
+                lock.release()
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,85 @@
+import logging
+import os
+import time
+from pathlib import Path
+
+from celery.signals import before_task_publish, task_postrun, task_prerun, worker_process_shutdown
+from django.conf import settings
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+
+logger = logging.getLogger(__name__)
+
+# prometheus_client runs in multiprocess mode, the settings point PROMETHEUS_MULTIPROC_DIR to
+# METRICS_DIR before it is imported. Every process keeps its values in its own mmap files there.
+Path(settings.METRICS_DIR).mkdir(parents=True, exist_ok=True)
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# Pipeline stages, per domain where it applies
+FETCH_SECONDS = Histogram(
+    "scraper_fetch_seconds", "Time to fetch a page", ["domain", "method"], buckets=DEFAULT_BUCKETS
+)
+FETCH_BYTES = Counter("scraper_fetch_bytes_total", "Bytes of html downloaded", ["domain", "method"])
+RATE_LIMITED = Counter("scraper_rate_limited_total", "Fetches deferred by the domain rate limit", ["domain"])
+SELENIUM_SESSION_SECONDS = Histogram(
+    "selenium_session_setup_seconds", "Time to open a new selenium session", buckets=DEFAULT_BUCKETS
+)
+LINK_EXTRACT_SECONDS = Histogram(
+    "links_extract_seconds", "Time to extract the links of a front page", ["domain"], buckets=DEFAULT_BUCKETS
+)
+ARTICLE_EXTRACT_SECONDS = Histogram(
+    "article_extract_seconds", "Time to fetch and parse an article", ["domain", "method"], buckets=DEFAULT_BUCKETS
+)
+LINKS_DISCOVERED = Counter("links_discovered_total", "Article links found on front pages", ["domain"])
+LINKS_NEW = Counter("links_new_total", "Links not seen before, queued for scraping", ["domain"])
+DEDUP_CHECKS = Counter("dedup_checks_total", "Scraped articles checked for near duplicates", ["result"])
+
+# Celery
+TASK_SECONDS = Histogram("celery_task_seconds", "Run time of celery tasks", ["task", "state"], buckets=DEFAULT_BUCKETS)
+QUEUE_LAG_SECONDS = Histogram(
+    "celery_queue_lag_seconds", "Time between publishing a task and a worker starting it", ["task", "queue"],
+    buckets=DEFAULT_BUCKETS,
+)
+
+
+def collect():
+    """Registry of the metrics of every process which wrote to METRICS_DIR, added up per label set."""
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=settings.METRICS_DIR)
+    return registry
+
+
+def render():
+    """Prometheus text exposition of the metrics of all processes."""
+    return generate_latest(collect())
+
+
+@worker_process_shutdown.connect
+def process_exited(pid=None, **kwargs):
+    multiprocess.mark_process_dead(pid or os.getpid(), path=settings.METRICS_DIR)
+
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    if headers is not None:
+        headers.setdefault("published_at", time.time())
+
+
+_task_started = {}
+
+
+@task_prerun.connect
+def task_started(task_id=None, task=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+    published_at = getattr(task.request, "published_at", None)
+    if published_at:
+        queue = (task.request.delivery_info or {}).get("routing_key") or ""
+        QUEUE_LAG_SECONDS.labels(task=task.name, queue=queue).observe(max(0.0, time.time() - published_at))
+
+
+@task_postrun.connect
+def task_finished(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_SECONDS.labels(task=task.name, state=state or "").observe(time.perf_counter() - started)
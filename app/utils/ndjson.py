@@ -0,0 +1,65 @@
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class NdjsonWriter:
+    """
+    Encodes rows as newline delimited json into blocks of about `buffer_size` bytes.
+
+    Only one block is held in memory at a time. With `compress` the blocks are
+    a gzip stream, written by one zlib compressor over the whole export.
+    """
+
+    def __init__(self, compress=False, buffer_size=64 * 1024):
+        self.compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+        self.encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        self.buffer_size = buffer_size
+        self.buffer = []
+        self.size = 0
+
+    def write(self, row):
+        """Add `row` and return the next block once the buffer is full, else b""."""
+        line = (self.encoder.encode(row) + "\n").encode("utf-8")
+        self.buffer.append(line)
+        self.size += len(line)
+        if self.size < self.buffer_size:
+            return b""
+
+        block = b"".join(self.buffer)
+        self.buffer, self.size = [], 0
+        return self.compressor.compress(block) if self.compressor else block
+
+    def close(self):
+        """The last block."""
+        block = b"".join(self.buffer)
+        self.buffer, self.size = [], 0
+        if self.compressor:
+            block = self.compressor.compress(block) + self.compressor.flush()
+        return block
+
+
+def iter_ndjson(rows, compress=False, buffer_size=64 * 1024):
+    """Encode `rows` as newline delimited json and yield it in blocks of about `buffer_size` bytes."""
+    writer = NdjsonWriter(compress, buffer_size)
+    for row in rows:
+        block = writer.write(row)
+        if block:
+            yield block
+
+    block = writer.close()
+    if block:
+        yield block
+
+
+async def aiter_ndjson(rows, compress=False, buffer_size=64 * 1024):
+    """`iter_ndjson` of an async iterator of rows, for streaming responses served by daphne."""
+    writer = NdjsonWriter(compress, buffer_size)
+    async for row in rows:
+        block = writer.write(row)
+        if block:
+            yield block
+
+    block = writer.close()
+    if block:
+        yield block
@@ -0,0 +1,247 @@
+"""
+Bikram Sambat dates, as published by the Nepali portals, and their Gregorian dates.
+
+A BS month has 29 to 32 days depending on the year, so conversion goes through
+a precomputed table of month lengths and the day offset of every month from
+Baisakh 1, 2000 BS. Single dates are converted with plain python, batches of
+dates with numpy in one pass over arrays.
+"""
+import bisect
+import datetime as dt
+import zoneinfo
+
+import numpy as np
+
+from app.utils.devanagari import to_ascii_digits
+
+# Days of the months, Baisakh to Chaitra, of the years MIN_YEAR to MAX_YEAR BS
+MONTH_DAYS = (
+    (30, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31),  # 2000
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2001
+    (31, 31, 32, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2002
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2003
+    (30, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31),  # 2004
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2005
+    (31, 31, 32, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2006
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2007
+    (31, 31, 31, 32, 31, 31, 29, 30, 30, 29, 29, 31),  # 2008
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2009
+    (31, 31, 32, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2010
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2011
+    (31, 31, 31, 32, 31, 31, 29, 30, 30, 29, 30, 30),  # 2012
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2013
+    (31, 31, 32, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2014
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2015
+    (31, 31, 31, 32, 31, 31, 29, 30, 30, 29, 30, 30),  # 2016
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2017
+    (31, 32, 31, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2018
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31),  # 2019
+    (31, 31, 31, 32, 31, 31, 30, 29, 30, 29, 30, 30),  # 2020
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2021
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 30),  # 2022
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31),  # 2023
+    (31, 31, 31, 32, 31, 31, 30, 29, 30, 29, 30, 30),  # 2024
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2025
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2026
+    (30, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31),  # 2027
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2028
+    (31, 31, 32, 31, 32, 30, 30, 29, 30, 29, 30, 30),  # 2029
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2030
+    (30, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31),  # 2031
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2032
+    (31, 31, 32, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2033
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2034
+    (30, 32, 31, 32, 31, 31, 29, 30, 30, 29, 29, 31),  # 2035
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2036
+    (31, 31, 32, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2037
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2038
+    (31, 31, 31, 32, 31, 31, 29, 30, 30, 29, 30, 30),  # 2039
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2040
+    (31, 31, 32, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2041
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2042
+    (31, 31, 31, 32, 31, 31, 29, 30, 30, 29, 30, 30),  # 2043
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2044
+    (31, 32, 31, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2045
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2046
+    (31, 31, 31, 32, 31, 31, 30, 29, 30, 29, 30, 30),  # 2047
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2048
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 30),  # 2049
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31),  # 2050
+    (31, 31, 31, 32, 31, 31, 30, 29, 30, 29, 30, 30),  # 2051
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2052
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 30),  # 2053
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31),  # 2054
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2055
+    (31, 31, 32, 31, 32, 30, 30, 29, 30, 29, 30, 30),  # 2056
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2057
+    (30, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31),  # 2058
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2059
+    (31, 31, 32, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2060
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2061
+    (31, 31, 31, 32, 31, 31, 29, 30, 29, 30, 29, 31),  # 2062
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2063
+    (31, 31, 32, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2064
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2065
+    (31, 31, 31, 32, 31, 31, 29, 30, 30, 29, 29, 31),  # 2066
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2067
+    (31, 31, 32, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2068
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2069
+    (31, 31, 31, 32, 31, 31, 29, 30, 30, 29, 30, 30),  # 2070
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2071
+    (31, 32, 31, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2072
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 31),  # 2073
+    (31, 31, 31, 32, 31, 31, 30, 29, 30, 29, 30, 30),  # 2074
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2075
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 30),  # 2076
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31),  # 2077
+    (31, 31, 31, 32, 31, 31, 30, 29, 30, 29, 30, 30),  # 2078
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2079
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 29, 30, 30),  # 2080
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 30, 29, 31),  # 2081
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2082
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 29, 30, 30),  # 2083
+    (31, 31, 32, 31, 31, 30, 30, 30, 29, 30, 30, 30),  # 2084
+    (31, 32, 31, 32, 30, 31, 30, 30, 29, 30, 30, 30),  # 2085
+    (30, 32, 31, 32, 31, 30, 30, 30, 29, 30, 30, 30),  # 2086
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 30, 30, 30),  # 2087
+    (30, 31, 32, 32, 30, 31, 30, 30, 29, 30, 30, 30),  # 2088
+    (30, 32, 31, 32, 31, 30, 30, 30, 29, 30, 30, 30),  # 2089
+    (30, 32, 31, 32, 31, 30, 30, 30, 29, 30, 30, 30),  # 2090
+    (31, 31, 32, 31, 31, 31, 30, 30, 29, 30, 30, 30),  # 2091
+    (30, 31, 32, 32, 31, 30, 30, 30, 29, 30, 30, 30),  # 2092
+    (30, 32, 31, 32, 31, 30, 30, 30, 29, 30, 30, 30),  # 2093
+    (31, 31, 32, 31, 31, 30, 30, 30, 29, 30, 30, 30),  # 2094
+    (31, 31, 32, 31, 31, 31, 30, 29, 30, 30, 30, 30),  # 2095
+    (30, 31, 32, 32, 31, 30, 30, 29, 30, 29, 30, 30),  # 2096
+    (31, 32, 31, 32, 31, 30, 30, 30, 29, 30, 30, 30),  # 2097
+    (31, 31, 32, 31, 31, 31, 29, 30, 29, 30, 29, 31),  # 2098
+    (31, 31, 32, 31, 31, 31, 30, 29, 29, 30, 30, 30),  # 2099
+    (31, 32, 31, 32, 30, 31, 30, 29, 30, 29, 30, 30),  # 2100
+)
+MIN_YEAR = 2000
+MAX_YEAR = MIN_YEAR + len(MONTH_DAYS) - 1
+# Baisakh 1, 2000 BS
+EPOCH = dt.date(1943, 4, 14)
+
+# Dates and times on the portals are Nepal time
+NEPAL_TZ = zoneinfo.ZoneInfo("Asia/Kathmandu")
+
+MONTH_LENGTHS = np.array(MONTH_DAYS, dtype=np.int64).ravel()
+# Days from EPOCH to the first of every month, the last entry is the day after Chaitra MAX_YEAR
+MONTH_STARTS = np.concatenate(([0], np.cumsum(MONTH_LENGTHS)))
+_month_starts = MONTH_STARTS.tolist()
+
+# Month names as written on the portals, with their common spellings and romanisations
+MONTHS = {
+    name: number
+    for number, names in enumerate(
+        (
+            ("वैशाख", "बैशाख", "बैसाख", "baisakh", "baishakh"),
+            ("जेठ", "जेष्ठ", "ज्येष्ठ", "jestha", "jeth"),
+            ("असार", "आषाढ", "asar", "ashadh", "ashar"),
+            ("साउन", "श्रावण", "shrawan", "saun", "shravan"),
+            ("भदौ", "भाद्र", "bhadra", "bhadau"),
+            ("असोज", "आश्विन", "asoj", "ashwin"),
+            ("कात्तिक", "कार्तिक", "kartik", "kattik"),
+            ("मंसिर", "मङ्सिर", "मार्ग", "mangsir", "marga"),
+            ("पुस", "पौष", "poush", "push", "paush"),
+            ("माघ", "magh"),
+            ("फागुन", "फाल्गुन", "falgun", "phagun"),
+            ("चैत", "चैत्र", "chaitra", "chait"),
+        ),
+        start=1,
+    )
+    for name in names
+}
+
+
+def month_number(month):
+    """Number of a BS month from its name or its (Devanagari) number."""
+    month = to_ascii_digits(month.strip()).lower()
+    if month.isdigit():
+        return int(month)
+    try:
+        return MONTHS[month]
+    except KeyError:
+        raise ValueError(f"Unknown Bikram Sambat month {month!r}") from None
+
+
+def bs_to_ad(year, month, day):
+    """Gregorian date of the BS date, ValueError when it is not a date of the table."""
+    if not (MIN_YEAR <= year <= MAX_YEAR and 1 <= month <= 12):
+        raise ValueError(f"Bikram Sambat date {year}-{month}-{day} is out of range")
+    if not 1 <= day <= MONTH_DAYS[year - MIN_YEAR][month - 1]:
+        raise ValueError(f"Bikram Sambat month {year}-{month} has no day {day}")
+    return EPOCH + dt.timedelta(days=_month_starts[(year - MIN_YEAR) * 12 + month - 1] + day - 1)
+
+
+def ad_to_bs(date):
+    """`(year, month, day)` BS of the Gregorian date."""
+    offset = (date - EPOCH).days
+    if not 0 <= offset < _month_starts[-1]:
+        raise ValueError(f"{date} is out of the Bikram Sambat range")
+    index = bisect.bisect_right(_month_starts, offset) - 1
+    year, month = divmod(index, 12)
+    return MIN_YEAR + year, month + 1, offset - _month_starts[index] + 1
+
+
+def bs_to_ad_array(years, months, days):
+    """datetime64[D] array of the Gregorian dates of the BS dates, NaT where a date is invalid."""
+    years, months, days = (np.asarray(values, dtype=np.int64) for values in (years, months, days))
+    year_index = years - MIN_YEAR
+    valid = (year_index >= 0) & (year_index < len(MONTH_DAYS)) & (months >= 1) & (months <= 12) & (days >= 1)
+    index = np.where(valid, year_index * 12 + months - 1, 0)
+    valid &= days <= MONTH_LENGTHS[index]
+
+    dates = np.datetime64(EPOCH, "D") + (MONTH_STARTS[index] + days - 1).astype("timedelta64[D]")
+    dates[~valid] = np.datetime64("NaT")
+    return dates
+
+
+def ad_to_bs_array(dates):
+    """`(years, months, days)` arrays of the BS dates of datetime64 dates, 0 where a date is out of range."""
+    offsets = (np.asarray(dates, dtype="datetime64[D]") - np.datetime64(EPOCH, "D")).astype(np.int64)
+    valid = (offsets >= 0) & (offsets < MONTH_STARTS[-1])
+    index = np.searchsorted(MONTH_STARTS, np.where(valid, offsets, 0), side="right") - 1
+    years, months = np.divmod(index, 12)
+    return (
+        np.where(valid, MIN_YEAR + years, 0),
+        np.where(valid, months + 1, 0),
+        np.where(valid, offsets - MONTH_STARTS[index] + 1, 0),
+    )
+
+
+def _fields(fields):
+    """`(year, month, day, minutes of the day)` of the groups matched by a date pattern."""
+    hour, minute = int(fields.get("hour") or 0), int(fields.get("minute") or 0)
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid time {hour}:{minute}")
+    month = month_number(fields.get("month") or fields.get("month_name") or "")
+    return int(fields["year"]), month, int(fields["day"]), hour * 60 + minute
+
+
+def bikram_sambat_date(fields):
+    """Aware datetime of the BS year, month (or month_name), day, hour and minute matched by a date pattern."""
+    try:
+        year, month, day, minutes = _fields(fields)
+        date = bs_to_ad(year, month, day)
+    except (KeyError, ValueError):
+        return None
+    published_at = dt.datetime.combine(date, dt.time()) + dt.timedelta(minutes=minutes)
+    return published_at.replace(tzinfo=NEPAL_TZ)
+
+
+def bikram_sambat_dates(rows):
+    """`bikram_sambat_date` of every matched date, converted as one batch."""
+    parsed = []
+    for fields in rows:
+        try:
+            parsed.append(_fields(fields))
+        except (KeyError, ValueError):
+            # Month 0 is not a date, it comes out as NaT
+            parsed.append((0, 0, 0, 0))
+
+    years, months, days, minutes = zip(*parsed) if parsed else ((), (), (), ())
+    dates = bs_to_ad_array(years, months, days)
+    stamps = dates.astype("datetime64[m]") + np.asarray(minutes, dtype="timedelta64[m]")
+    return [None if value is None else value.replace(tzinfo=NEPAL_TZ) for value in stamps.tolist()]
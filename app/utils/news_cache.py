@@ -0,0 +1,69 @@
+import datetime as dt
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+# Listing entries embed the version of every date they cover, bumping the
+# version of one date orphans exactly the entries which include that date.
+VERSION_KEY = "news:version:{date}"
+LIST_KEY = "news:list:{digest}"
+DETAIL_KEY = "news:detail:{id}"
+
+
+def _dates(date_from, date_to):
+    return [date_from + dt.timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+
+
+async def date_versions(date_from, date_to):
+    keys = [VERSION_KEY.format(date=date.isoformat()) for date in _dates(date_from, date_to)]
+    versions = await cache.aget_many(keys)
+
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        await cache.aset_many(missing, timeout=None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+async def list_cache_key(params):
+    """Cache key of a listing, or None when the date range is too long to be worth caching."""
+    date_from, date_to = params["date_from"], params["date_to"]
+    if (date_to - date_from).days >= settings.NEWS_CACHE_MAX_DAYS:
+        return None
+
+    payload = json.dumps(
+        {"params": params, "versions": await date_versions(date_from, date_to)},
+        sort_keys=True,
+        default=str,
+    )
+    return LIST_KEY.format(digest=hashlib.sha1(payload.encode("utf-8")).hexdigest())
+
+
+def detail_cache_key(news_id):
+    return DETAIL_KEY.format(id=news_id)
+
+
+def cache_timeout(date_to):
+    """Closed past days hardly change, today is still being scraped."""
+    if date_to < timezone.localdate():
+        return settings.NEWS_CACHE_TTL_PAST
+    return settings.NEWS_CACHE_TTL_TODAY
+
+
+def invalidate_news(news_id, *published_at):
+    """Drop the cached detail of a news and every listing covering its published dates."""
+    keys = {
+        VERSION_KEY.format(date=timezone.localtime(value).date().isoformat())
+        for value in published_at
+        if value is not None
+    }
+    cache.set_many({key: time.time_ns() for key in keys}, timeout=None)
+    cache.delete(detail_cache_key(news_id))
+
+
+def invalidate_news_details(news_ids):
+    cache.delete_many([detail_cache_key(news_id) for news_id in news_ids])
@@ -0,0 +1,116 @@
+import logging
+import time
+from urllib import robotparser
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from app.utils.metrics import RATE_LIMITED
+from app.utils.redis_client import get_redis
+from app.utils.urls import site_of
+
+logger = logging.getLogger(__name__)
+
+# Token bucket shared by every worker, refilled from the redis clock so worker clocks do not matter.
+# Takes a token when one is available and returns "0", otherwise returns the seconds until the next token.
+TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 60)
+return tostring(wait)
+"""
+
+ROBOTS_CACHE_KEY = "robots:crawl_delay:{domain}"
+
+
+class RateLimited(Exception):
+    """The domain has no token left, retry after `retry_after` seconds."""
+
+    def __init__(self, domain, retry_after):
+        super().__init__(f"Rate limit of {domain} reached, retry in {retry_after:.1f}s")
+        self.domain = domain
+        self.retry_after = retry_after
+
+
+def robots_crawl_delay(url):
+    """Crawl-delay of the robots.txt of the site of `url`, cached for a day."""
+    domain = site_of(url)
+    key = ROBOTS_CACHE_KEY.format(domain=domain)
+    delay = cache.get(key)
+    if delay is not None:
+        return delay
+
+    parts = urlsplit(url)
+    parser = robotparser.RobotFileParser()
+    try:
+        response = requests.get(
+            f"{parts.scheme}://{parts.netloc}/robots.txt",
+            headers={"User-Agent": settings.SCRAPER_USER_AGENT},
+            timeout=settings.SCRAPER_HTTP_TIMEOUT,
+        )
+        parser.parse(response.text.splitlines() if response.status_code == 200 else [])
+        delay = float(parser.crawl_delay(settings.SCRAPER_USER_AGENT) or 0)
+    except requests.RequestException:
+        logger.info(f"Could not read robots.txt of {domain}", exc_info=True)
+        delay = 0.0
+
+    cache.set(key, delay, 60 * 60 * 24)
+    return delay
+
+
+def domain_rate(url):
+    """(requests per second, burst) allowed against the site of `url`."""
+    domain = site_of(url)
+    rate, burst = settings.CRAWL_RATE_LIMITS.get(domain, settings.CRAWL_RATE_LIMITS["default"])
+
+    if settings.CRAWL_RESPECT_ROBOTS:
+        delay = robots_crawl_delay(url)
+        if delay:
+            rate = min(rate, 1 / delay)
+    return rate, burst
+
+
+def try_acquire(url):
+    """Take a request token for the site of `url`, returns 0 or the seconds to wait for the next one."""
+    if not settings.CRAWL_RATE_LIMIT_ENABLED:
+        return 0.0
+
+    rate, burst = domain_rate(url)
+    key = f"ratelimit:{site_of(url)}"
+    return float(get_redis().eval(TOKEN_BUCKET, 1, key, rate, burst))
+
+
+def throttle(url, max_wait=None):
+    """
+    Wait for a request token of the site of `url`.
+
+    Short waits are slept through, when the wait is longer than `max_wait`
+    RateLimited is raised so the caller can work on another domain instead.
+    """
+    max_wait = settings.CRAWL_RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+    while True:
+        wait = try_acquire(url)
+        if not wait:
+            return
+        if wait > max_wait:
+            RATE_LIMITED.labels(domain=site_of(url)).inc()
+            raise RateLimited(site_of(url), wait)
+        time.sleep(wait)
@@ -0,0 +1,13 @@
+import redis
+from django.conf import settings
+
+_client = None
+
+
+def get_redis():
+    """Shared redis client, the connection pool is re-created by redis-py after a fork."""
+    global _client
+
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
@@ -1,25 +1,213 @@
+import logging
+import os
+import re
+import threading
+from functools import lru_cache
 
-from selenium import webdriver
-from selenium.webdriver.firefox.options import Options
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from environs import Env
+from app.utils.driver_pool import get_driver_pool
+from app.utils.metrics import FETCH_BYTES, FETCH_SECONDS
+from app.utils.rate_limiter import throttle
+from app.utils.urls import site_of
 
+logger = logging.getLogger(__name__)
 
-env = Env()
-env.read_env()
+_local = threading.local()
 
-def scrape(url):
 
-    firefox_options = webdriver.FirefoxOptions()
-    driver = webdriver.Remote(
-        command_executor=env("SELENIUM_HOST"),
-        options=firefox_options
+def get_http_session():
+    """Return the keep-alive HTTP session of the current thread."""
+    session = getattr(_local, "session", None)
+    if session is None or _local.pid != os.getpid():
+        session = requests.Session()
+        session.headers.update({"User-Agent": settings.SCRAPER_USER_AGENT})
+        adapter = HTTPAdapter(
+            pool_connections=settings.SCRAPER_HTTP_POOL_SIZE,
+            pool_maxsize=settings.SCRAPER_HTTP_POOL_SIZE,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(502, 503, 504)),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _local.session = session
+        _local.pid = os.getpid()
+    return session
+
+
+@lru_cache(maxsize=None)
+def _js_required_patterns(patterns):
+    return [re.compile(pattern) for pattern in patterns]
+
+
+def requires_js(url):
+    """Sites or url patterns configured in SCRAPER_JS_REQUIRED always go through selenium."""
+    patterns = _js_required_patterns(tuple(settings.SCRAPER_JS_REQUIRED))
+    return any(pattern.search(url) for pattern in patterns)
+
+
+def looks_complete(page_source):
+    """Quick check that a server rendered page actually carries content."""
+    return (
+        page_source is not None
+        and len(page_source) >= settings.SCRAPER_MIN_CONTENT_LENGTH
+        and "<a " in page_source
+    )
+
+
+class FetchResult:
+    """Outcome of fetching a page, `page_source` is None when the server answered 304."""
+
+    def __init__(self, page_source=None, etag="", last_modified="", not_modified=False):
+        self.page_source = page_source
+        self.etag = etag
+        self.last_modified = last_modified
+        self.not_modified = not_modified
+
+
+def _set_encoding(response):
+    # requests assumes latin-1 for text/html without a charset, the portals serve utf-8
+    if "charset" not in response.headers.get("Content-Type", "").lower():
+        response.encoding = "utf-8"
+
+
+def fetch_http(url, etag="", last_modified="", throttled=False):
+    """
+    Fetch the page with plain HTTP, sending conditional headers when validators are given.
+
+    Returns None when the response is not usable html.
+    """
+    if not throttled:
+        throttle(url)
+
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    domain = site_of(url)
+    try:
+        with FETCH_SECONDS.labels(domain=domain, method="http").time():
+            response = get_http_session().get(url, headers=headers, timeout=settings.SCRAPER_HTTP_TIMEOUT)
+    except requests.RequestException:
+        logger.info(f"HTTP fetch failed for {url}", exc_info=True)
+        return None
+
+    if response.status_code == 304:
+        return FetchResult(etag=etag, last_modified=last_modified, not_modified=True)
+
+    content_type = response.headers.get("Content-Type", "")
+    if response.status_code != 200 or "html" not in content_type:
+        logger.info(f"HTTP fetch of {url} returned {response.status_code} {content_type}")
+        return None
+
+    FETCH_BYTES.labels(domain=domain, method="http").inc(len(response.content))
+    _set_encoding(response)
+    return FetchResult(
+        page_source=response.text,
+        etag=response.headers.get("ETag", ""),
+        last_modified=response.headers.get("Last-Modified", ""),
     )
-    
-    driver.get(url)
 
-    page_source = driver.execute_script("return document.body.innerHTML;")
-    driver.quit() 
 
-    return page_source 
+def fetch_selenium(url, throttled=False, pool=None):
+    """
+    Render the page in a session of `pool`, the driver pool of the process by default.
+
+    `throttled` when the caller already took a rate limit token for the page.
+    """
+    if not throttled:
+        throttle(url)
 
+    domain = site_of(url)
+    pool = pool or get_driver_pool()
+    with FETCH_SECONDS.labels(domain=domain, method="selenium").time(), pool.session() as driver:
+        driver.get(url)
+
+        page_source = driver.execute_script("return document.body.innerHTML;")
+
+    FETCH_BYTES.labels(domain=domain, method="selenium").inc(len(page_source.encode("utf-8")))
+    return page_source
+
+
+def fetch(url, etag="", last_modified=""):
+    """
+    Fetch `url` and return a FetchResult.
+
+    Pages are fetched over keep-alive HTTP first and only escalated to a pooled
+    selenium session when the url is configured as JS-required or when the HTTP
+    response does not look like a rendered page.
+    """
+    if not requires_js(url):
+        result = fetch_http(url, etag, last_modified)
+        if result is not None and (result.not_modified or looks_complete(result.page_source)):
+            return result
+        logger.info(f"Falling back to selenium for {url}")
+        # One fetch of the page, fetch_http took its token already
+        return FetchResult(page_source=fetch_selenium(url, throttled=True))
+
+    return FetchResult(page_source=fetch_selenium(url))
+
+
+class PageStream:
+    """Text chunks of a page and the method which actually fetched it, "http" or "selenium"."""
+
+    def __init__(self, chunks, method):
+        self.chunks = chunks
+        self.method = method
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+
+def _iter_response(response, domain):
+    size = 0
+    try:
+        with response:
+            for chunk in response.iter_content(chunk_size=settings.SCRAPER_STREAM_CHUNK_SIZE, decode_unicode=True):
+                size += len(chunk.encode("utf-8"))
+                yield chunk
+    finally:
+        FETCH_BYTES.labels(domain=domain, method="http").inc(size)
+
+
+def _iter_text(text):
+    chunk_size = settings.SCRAPER_STREAM_CHUNK_SIZE
+    for start in range(0, len(text), chunk_size):
+        yield text[start:start + chunk_size]
+
+
+def fetch_stream(url, force_selenium=False):
+    """
+    Return a PageStream over the html of `url` in text chunks.
+
+    HTTP responses are decoded as they arrive, the page is never held as one
+    string. Selenium can only return the whole document, which is then handed
+    out in chunks as well.
+    """
+    if not force_selenium and not requires_js(url):
+        throttle(url)
+        domain = site_of(url)
+        try:
+            # Only the time to the response headers, the body is read while it is parsed
+            with FETCH_SECONDS.labels(domain=domain, method="http").time():
+                response = get_http_session().get(url, stream=True, timeout=settings.SCRAPER_HTTP_TIMEOUT)
+        except requests.RequestException:
+            logger.info(f"HTTP fetch failed for {url}", exc_info=True)
+        else:
+            if response.status_code == 200 and "html" in response.headers.get("Content-Type", ""):
+                _set_encoding(response)
+                return PageStream(_iter_response(response, domain), "http")
+            response.close()
+        logger.info(f"Falling back to selenium for {url}")
+        return PageStream(_iter_text(fetch_selenium(url, throttled=True)), "selenium")
+
+    return PageStream(_iter_text(fetch_selenium(url)), "selenium")
+
+
+def scrape(url):
+    """Return the html of `url`."""
+    return fetch(url).page_source
@@ -0,0 +1,171 @@
+import logging
+import math
+import threading
+
+from celery.signals import worker_ready
+from django.conf import settings
+
+from app.models.link import Link
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """
+    Fixed size bloom filter over hex digests.
+
+    The keys are already sha256 digests, so the bit positions are derived from
+    slices of the key with double hashing instead of hashing again.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key):
+        h1 = int(key[:16], 16)
+        h2 = int(key[16:32], 16) | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SeenUrlIndex:
+    """
+    Answers "was this url hash seen before" without touching the database.
+
+    A local bloom filter remembers the hashes this process has stored. Hashes it
+    does not know are looked up in sharded redis sets. The links table stays the
+    source of truth: hashes are only marked as seen once their links are inserted,
+    and SADD, which is atomic, then tells which worker inserted a link first so
+    only that one queues it. Without a redis client the index is process local.
+    """
+
+    # Member of every shard after a rebuild, a shard without it was evicted
+    SENTINEL = "-"
+
+    def __init__(self, redis=None, shards=64, capacity=1_000_000, error_rate=1e-6, key_prefix="seen_urls"):
+        self.redis = redis
+        self.shards = shards
+        self.key_prefix = key_prefix
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.bloom_count = 0
+        self._lock = threading.Lock()
+
+    def _shard_key(self, key):
+        return f"{self.key_prefix}:{int(key[:8], 16) % self.shards}"
+
+    def _shard_keys(self):
+        return [f"{self.key_prefix}:{shard}" for shard in range(self.shards)]
+
+    def unseen(self, keys):
+        """The keys which are not marked as seen, nothing is changed."""
+        with self._lock:
+            candidates = [key for key in dict.fromkeys(keys) if key not in self.bloom]
+
+        if not candidates or self.redis is None:
+            return candidates
+
+        pipe = self.redis.pipeline(transaction=False)
+        for key in candidates:
+            pipe.sismember(self._shard_key(key), key)
+        return [key for key, seen in zip(candidates, pipe.execute()) if not seen]
+
+    def mark_seen(self, keys):
+        """Mark `keys`, already stored in the database, as seen and return the ones no other worker marked first."""
+        keys = list(dict.fromkeys(keys))
+        if self.redis is None:
+            new = keys
+        else:
+            pipe = self.redis.pipeline(transaction=False)
+            for key in keys:
+                pipe.sadd(self._shard_key(key), key)
+            new = [key for key, added in zip(keys, pipe.execute()) if added]
+
+        with self._lock:
+            # A full filter turns into false positives which drop new links, start a fresh one,
+            # the redis sets still know every key
+            if self.redis is not None and self.bloom_count + len(keys) > self.capacity:
+                self.bloom = BloomFilter(self.capacity, self.error_rate)
+                self.bloom_count = 0
+            for key in keys:
+                self.bloom.add(key)
+            self.bloom_count += len(keys)
+        return new
+
+    def missing_shards(self):
+        """Whether a shard was evicted since the last rebuild, or the index was never built."""
+        return self.redis.exists(*self._shard_keys()) < self.shards
+
+    def rebuild(self, keys, chunk_size=10000):
+        """Load existing hashes, e.g. every url_hash stored in the database."""
+        if self.redis is None:
+            count = 0
+            for key in keys:
+                with self._lock:
+                    self.bloom.add(key)
+                count += 1
+            return count
+
+        count = 0
+        pipe = self.redis.pipeline(transaction=False)
+        for shard_key in self._shard_keys():
+            pipe.sadd(shard_key, self.SENTINEL)
+        for key in keys:
+            pipe.sadd(self._shard_key(key), key)
+            count += 1
+            if count % chunk_size == 0:
+                pipe.execute()
+        pipe.execute()
+        return count
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_seen_index():
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SeenUrlIndex(
+                    redis=get_redis(),
+                    shards=settings.SEEN_URL_INDEX_SHARDS,
+                    capacity=settings.SEEN_URL_INDEX_CAPACITY,
+                    error_rate=settings.SEEN_URL_INDEX_ERROR_RATE,
+                )
+    return _index
+
+
+@worker_ready.connect
+def rebuild_seen_index(**kwargs):
+    """
+    Re-populate the shared index from the links table.
+
+    Runs at most once per SEEN_URL_INDEX_REBUILD_INTERVAL across workers, and
+    straight away when a shard is missing, e.g. evicted by redis.
+    """
+    index = get_seen_index()
+    flag = f"{index.key_prefix}:rebuilt"
+    if index.missing_shards():
+        index.redis.delete(flag)
+    if not index.redis.set(flag, 1, nx=True, ex=settings.SEEN_URL_INDEX_REBUILD_INTERVAL):
+        return
+
+    try:
+        count = index.rebuild(Link.objects.values_list("url_hash", flat=True).iterator(chunk_size=10000))
+    except Exception:
+        index.redis.delete(flag)
+        raise
+    logger.info(f"Rebuilt seen url index with {count} links")
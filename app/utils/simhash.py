@@ -0,0 +1,50 @@
+import hashlib
+from collections import Counter
+
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def features(tokens):
+    """Words and word pairs, the pairs keep some word order without making short texts too sensitive to edits."""
+    return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+
+def simhash(tokens):
+    """64 bit SimHash of `tokens`, near identical texts differ in a few bits."""
+    weights = [0] * BITS
+    for feature, count in Counter(features(tokens)).items():
+        value = _feature_hash(feature)
+        for bit in range(BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming_distance(a, b):
+    return bin((a ^ b) & ((1 << BITS) - 1)).count("1")
+
+
+def bands(value):
+    """
+    Split the hash into BANDS blocks of 16 bits.
+
+    Two hashes within BANDS - 1 differing bits share at least one whole block,
+    so equality lookups on the blocks find every near duplicate candidate.
+    """
+    return [(value >> (band * BAND_BITS)) & BAND_MASK for band in range(BANDS)]
+
+
+def to_signed(value):
+    """Map an unsigned 64 bit hash onto the range of a postgres bigint."""
+    return value - (1 << BITS) if value >= 1 << (BITS - 1) else value
+
+
+def to_unsigned(value):
+    return value + (1 << BITS) if value < 0 else value
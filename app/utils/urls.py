@@ -0,0 +1,41 @@
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters which only track the visitor and never change the page
+TRACKING_PARAMS = {"fbclid", "gclid", "ref", "mc_cid", "mc_eid"}
+
+
+def normalize_url(url):
+    """
+    Canonical form of a url used for deduplication.
+
+    Scheme and host are lower cased, default ports, fragments, tracking parameters
+    and trailing slashes are dropped and the remaining query parameters are sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/") or "/"
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS and not key.startswith("utm_")
+    )
+
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def url_hash(url):
+    """sha256 hex digest of the normalized url."""
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+def site_of(url):
+    """Domain of a url without the www prefix, used as the source of a link."""
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
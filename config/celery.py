@@ -2,6 +2,7 @@ import os
 
 from celery import Celery
 from environs import Env
+from kombu import Queue
 
 env = Env()
 env.read_env()
@@ -16,5 +17,55 @@ app = Celery("config")
 
 app.config_from_object("django.conf:settings", namespace="CELERY")
 
+# Discovery, scraping, re-scraping and email run on their own queues so a burst of
+# article scrapes never delays the next front page crawl. Each queue is consumed by
+# its own worker, started with `python -m config.worker <queue>`, with the
+# concurrency and prefetch below. Scrapes are long and I/O bound, only the short
+# email tasks are prefetched.
+WORKER_QUEUES = {
+    "discovery": {"concurrency": 2, "prefetch_multiplier": 1},
+    "scrape": {"concurrency": 8, "prefetch_multiplier": 1},
+    "rescrape": {"concurrency": 2, "prefetch_multiplier": 1},
+    "email": {"concurrency": 1, "prefetch_multiplier": 4},
+}
+
+app.conf.task_queues = tuple(Queue(name) for name in WORKER_QUEUES)
+app.conf.task_default_queue = "scrape"
+
+app.conf.task_routes = {
+    "app.tasks.aggrigate_links_task.*": {"queue": "discovery", "priority": 0},
+    "app.tasks.rescrape_failed_task.*": {"queue": "rescrape", "priority": 9},
+    "app.tasks.scrape_article_task.*": {"queue": "scrape", "priority": 5},
+    "app.tasks.send_email_task.*": {"queue": "email", "priority": 5},
+    "app.tasks.snapshot_task.*": {"queue": "rescrape", "priority": 9},
+}
+
+# With redis 0 is the highest priority, messages are split in one list per step
+app.conf.broker_transport_options = {
+    "queue_order_strategy": "priority",
+    "priority_steps": list(range(10)),
+    "sep": ":",
+}
+app.conf.task_default_priority = 5
+
+# Workers acknowledge a message when done, so a killed worker loses nothing. A
+# worker started without WORKER_QUEUES, e.g. one consuming every queue, takes
+# one message at a time so a long scrape never holds back prefetched messages
+app.conf.worker_prefetch_multiplier = 1
+app.conf.task_acks_late = True
+app.conf.task_reject_on_worker_lost = True
+
 app.autodiscover_tasks()
 
+
+def worker_argv(queue):
+    """`celery worker` arguments of the worker consuming `queue`, with its concurrency and prefetch."""
+    options = WORKER_QUEUES[queue]
+    return [
+        "worker",
+        "--queues", queue,
+        "--concurrency", str(options["concurrency"]),
+        "--prefetch-multiplier", str(options["prefetch_multiplier"]),
+        "--hostname", f"{queue}@%h",
+        "--loglevel", "info",
+    ]
@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 from datetime import timedelta
 
+import os
+import tempfile
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from environs import Env
 
 from celery.schedules import crontab
@@ -47,6 +50,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'app',
 ]
@@ -93,9 +97,29 @@ DATABASES = {
         'PASSWORD': env("POSTGRES_PASSWORD"),
         'HOST': env("POSTGRES_HOST"),
         'PORT': env("POSTGRES_PORT"),
+        'CONN_MAX_AGE': env.int("DB_CONN_MAX_AGE", 60), # seconds a connection is reused, 0 closes it after every request or task
+        'CONN_HEALTH_CHECKS': True, # a reused connection is checked before the first query of a request or task
     }
 }
 
+# Connection profile of the process, set per process type in its environment
+#   persistent : gunicorn / daphne workers keep their own connection to postgres (default)
+#   pooled     : celery workers share server connections through pgbouncer in transaction mode
+#   direct     : a new connection for every request or task, e.g. for one-off management commands
+DB_CONNECTION_PROFILE = env("DB_CONNECTION_PROFILE", "persistent")
+
+if DB_CONNECTION_PROFILE == "pooled":
+    DATABASES['default'].update({
+        'HOST': env("PGBOUNCER_HOST", env("POSTGRES_HOST")),
+        'PORT': env("PGBOUNCER_PORT", "6432"),
+        # Named cursors do not survive transaction pooling, .iterator() falls back to client side cursors
+        'DISABLE_SERVER_SIDE_CURSORS': True,
+    })
+elif DB_CONNECTION_PROFILE == "direct":
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+elif DB_CONNECTION_PROFILE != "persistent":
+    raise ImproperlyConfigured(f"Unknown DB_CONNECTION_PROFILE {DB_CONNECTION_PROFILE!r}, use persistent, pooled or direct")
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
@@ -158,6 +182,64 @@ EMAIL_USE_TLS = True
 EMAIL_PORT = 587
 
 
+# Selenium settings
+SELENIUM_HOST = env("SELENIUM_HOST")
+SELENIUM_POOL_SIZE = env.int("SELENIUM_POOL_SIZE", 2) # sessions kept open per worker process
+SELENIUM_MAX_PAGES_PER_SESSION = env.int("SELENIUM_MAX_PAGES_PER_SESSION", 50) # recycle session after N pages
+SELENIUM_POOL_TIMEOUT = env.int("SELENIUM_POOL_TIMEOUT", 60) # seconds to wait for a free session
+SELENIUM_PAGE_LOAD_TIMEOUT = env.int("SELENIUM_PAGE_LOAD_TIMEOUT", 30)
+
+
+# Scraper settings
+SCRAPER_USER_AGENT = env("SCRAPER_USER_AGENT", "Mozilla/5.0 (compatible; NepaliNewsScrapper/1.0)")
+SCRAPER_HTTP_TIMEOUT = env.float("SCRAPER_HTTP_TIMEOUT", 10)
+SCRAPER_HTTP_POOL_SIZE = env.int("SCRAPER_HTTP_POOL_SIZE", 10) # keep-alive connections per host
+SCRAPER_MIN_CONTENT_LENGTH = env.int("SCRAPER_MIN_CONTENT_LENGTH", 2048) # smaller responses fall back to selenium
+# Regex patterns of urls which are rendered client side and always need selenium
+SCRAPER_JS_REQUIRED = env.list("SCRAPER_JS_REQUIRED", [])
+SCRAPER_STREAM_CHUNK_SIZE = env.int("SCRAPER_STREAM_CHUNK_SIZE", 16384) # characters fed to the parser at a time
+# Keep a copy of the scraped html in the html archive, the link only stores its hash
+SCRAPER_STORE_RAW_HTML = env.bool("SCRAPER_STORE_RAW_HTML", False)
+
+# Compressed, content addressed store of raw html outside the database
+HTML_ARCHIVE_BACKEND = "app.utils.html_archive.FileSystemArchive"
+HTML_ARCHIVE_OPTIONS = {
+    "root": env("HTML_ARCHIVE_ROOT", str(BASE_DIR.parent / "html_archive")),
+}
+
+# Politeness limits shared by all workers, (requests per second, burst) per domain
+CRAWL_RATE_LIMIT_ENABLED = env.bool("CRAWL_RATE_LIMIT_ENABLED", True)
+CRAWL_RATE_LIMITS = {
+    "default": (0.5, 3),
+}
+CRAWL_RESPECT_ROBOTS = env.bool("CRAWL_RESPECT_ROBOTS", True) # lower the rate to the Crawl-delay of robots.txt
+CRAWL_RATE_LIMIT_MAX_WAIT = env.float("CRAWL_RATE_LIMIT_MAX_WAIT", 2) # seconds a fetch may sleep for a token
+
+CRAWLER_TIMEOUT = env.float("CRAWLER_TIMEOUT", 45) # a crawl run must finish before the next beat tick
+CRAWLER_PER_HOST_LIMIT = env.int("CRAWLER_PER_HOST_LIMIT", 2) # concurrent fetches against one host
+CRAWLER_MAX_WORKERS = env.int("CRAWLER_MAX_WORKERS", 8)
+
+# Article extractor of each supported portal, keyed by domain. Modules are imported on first use
+NEWS_EXTRACTORS = {
+    "onlinekhabar.com": "app.extractors.onlinekhabar.OnlinekhabarExtractor",
+    "ekantipur.com": "app.extractors.ekantipur.EkantipurExtractor",
+}
+
+# Near duplicate detection, news within this many differing simhash bits are one story (at most 3)
+NEAR_DUPLICATE_MAX_DISTANCE = env.int("NEAR_DUPLICATE_MAX_DISTANCE", 3)
+NEAR_DUPLICATE_WINDOW_DAYS = env.int("NEAR_DUPLICATE_WINDOW_DAYS", 3) # only compare news published this close
+
+# The 4 simhash bands of 16 bits only guarantee a shared band up to 3 differing bits
+if not 0 <= NEAR_DUPLICATE_MAX_DISTANCE <= 3:
+    raise ImproperlyConfigured("NEAR_DUPLICATE_MAX_DISTANCE must be between 0 and 3")
+
+# Seen url index, a local bloom filter in front of sharded redis sets
+SEEN_URL_INDEX_SHARDS = env.int("SEEN_URL_INDEX_SHARDS", 64)
+SEEN_URL_INDEX_CAPACITY = env.int("SEEN_URL_INDEX_CAPACITY", 1_000_000) # links per worker process before error rate degrades
+SEEN_URL_INDEX_ERROR_RATE = env.float("SEEN_URL_INDEX_ERROR_RATE", 1e-6)
+SEEN_URL_INDEX_REBUILD_INTERVAL = env.int("SEEN_URL_INDEX_REBUILD_INTERVAL", 24 * 60 * 60) # seconds between rebuilds from the links table
+
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -166,12 +248,58 @@ SIMPLE_JWT = {
 }
 
 
+REDIS_URL = "redis://"+env('REDIS_HOST')+":6379"
+
+# Cache settings
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL + "/1",
+    }
+}
+
+NEWS_CACHE_TTL_PAST = env.int("NEWS_CACHE_TTL_PAST", 60 * 60 * 24) # seconds, listings of closed past days
+NEWS_CACHE_TTL_TODAY = env.int("NEWS_CACHE_TTL_TODAY", 60) # seconds, listings which include today
+NEWS_CACHE_MAX_DAYS = env.int("NEWS_CACHE_MAX_DAYS", 31) # longer date ranges are not cached
+
+
+# Daily Parquet partitions of the scraped news for analytics, see app/services/snapshot_service.py
+NEWS_SNAPSHOT_ROOT = env("NEWS_SNAPSHOT_ROOT", str(BASE_DIR.parent / "snapshots"))
+
+# Every process writes its metrics to files of this directory, /api/metrics/ adds them up. Clear it
+# when the workers are restarted, prometheus_client reads it through PROMETHEUS_MULTIPROC_DIR
+METRICS_DIR = env("METRICS_DIR", str(Path(tempfile.gettempdir()) / "news_metrics"))
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", METRICS_DIR)
+METRICS_ALLOWED_IPS = env.list("METRICS_ALLOWED_IPS", []) # prometheus servers, superusers are always allowed, never the reverse proxy
+
+
 # Celery settings
-CELERY_BROKER_URL = "redis://"+env('REDIS_HOST')+":6379"
-CELERY_RESULT_BACKEND = "redis://"+env('REDIS_HOST')+":6379"
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
+# Nobody reads the results of the scrape tasks, their outcome is stored on the Link row.
+# Tasks whose result is polled opt in with @celery_app.task(ignore_result=False).
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_RESULT_EXPIRES = env.int("CELERY_RESULT_EXPIRES", 60 * 60) # seconds an opted in result is kept
 
 # CELERY_IMPORTS = ('app.tasks.sample_task')
-CELERY_IMPORTS = ('app.tasks.aggrigate_links_task')
+CELERY_IMPORTS = (
+    'app.tasks.aggrigate_links_task',
+    'app.tasks.scrape_article_task',
+    'app.tasks.rescrape_failed_task',
+    'app.tasks.send_email_task',
+    'app.tasks.snapshot_task',
+)
+
+# Adaptive polling of the portal front pages, in seconds
+WATCH_MIN_INTERVAL = env.int("WATCH_MIN_INTERVAL", 30)
+WATCH_MAX_INTERVAL = env.int("WATCH_MAX_INTERVAL", 600)
+
+SCRAPE_BATCH_SIZE = env.int("SCRAPE_BATCH_SIZE", 20) # new links scraped by one task
+
+RESCRAPE_FAILED_AFTER_MINUTES = env.int("RESCRAPE_FAILED_AFTER_MINUTES", 15) # wait before trying a failed or stuck pending link again
+RESCRAPE_MAX_ATTEMPTS = env.int("RESCRAPE_MAX_ATTEMPTS", 5) # failed links are given up after this many scrapes
+RESCRAPE_BATCH_SIZE = env.int("RESCRAPE_BATCH_SIZE", 500) # failed links queued per run
+RESCRAPE_LOCK_TIMEOUT = env.int("RESCRAPE_LOCK_TIMEOUT", 900) # seconds, a crashed rescrape run stops blocking the next ones after this
 
 
 
@@ -184,6 +312,14 @@ CELERY_BEAT_SCHEDULE = { # scheduler configuration
     'aggrigate_links_task' : {  # whatever the name you want 
         'task': 'app.tasks.aggrigate_links_task', # name of task with path
         'task': 'app.tasks.aggrigate_links_task.aggrigate_links_task', # name of task with path
-        'schedule': crontab(), # crontab() runs the tasks every minute
+        'schedule': WATCH_MIN_INTERVAL, # each portal is only crawled when its own interval is due
+    },
+    'rescrape_failed_task' : {
+        'task': 'app.tasks.rescrape_failed_task.rescrape_failed_task',
+        'schedule': crontab(minute='*/15'),
+    },
+    'snapshot_news_task' : {
+        'task': 'app.tasks.snapshot_task.snapshot_news_task',
+        'schedule': crontab(minute=30), # hourly, unchanged days are skipped
     },
 }
\ No newline at end of file
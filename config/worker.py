@@ -0,0 +1,17 @@
+"""
+Starts the celery worker of one queue, configured from WORKER_QUEUES in config/celery.py
+
+    python -m config.worker scrape
+
+Options after the queue name are passed on to `celery worker` and win over the defaults.
+"""
+import sys
+
+from config.celery import WORKER_QUEUES, app, worker_argv
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in WORKER_QUEUES:
+        sys.exit(f"usage: python -m config.worker <queue> [options], queue is one of {', '.join(WORKER_QUEUES)}")
+
+    queue, *options = sys.argv[1:]
+    app.worker_main(worker_argv(queue) + options)